@@ -1,15 +1,38 @@
 import tarfile
 import os
+import stat
 import json
-from collections import namedtuple
+import queue
+import threading
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 import hashlib
 from tqdm import tqdm
-from crypto import EncryptionWriter, encrypt_name
+from crypto import ThreadedEncryptionWriter, HashReader, encrypt_name
 from tape import TapeDevice
 from config_manager import cfg
 from ui import console, confirm
 
+# Optional MessagePack support for the compact binary manifest sidecar.
+# JSON remains the canonical on-tape format (recovery depends on it).
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# NumPy (already pulled in by the barcode scanner) vectorizes the incremental
+# diff on very large scans; below this item count the Python loop wins.
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+NUMPY_DIFF_THRESHOLD = 50_000
+
 # Represents one file/directory node held in memory before the DB commit.
 # Parent relationships use list indices rather than DB row ids so that nothing
 # touches the database until the archive has been written successfully.
@@ -20,33 +43,207 @@ NodeRecord = namedtuple("NodeRecord", ["parent_idx", "name_stored", "is_dir", "s
 CAPACITY_CHECK_OVERHEAD = 1.02
 
 
+# Hash updates are buffered to this size so the C digest routine sees large
+# blocks instead of tar's 512-byte writes, amortizing the per-call overhead.
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Per-file copy buffer for tarfile: each archived file is shuttled from disk
+# into the tar stream in blocks of this size instead of the 10 KiB default,
+# cutting the Python-level read/write iterations per file ~100x.
+TAR_COPY_BUFSIZE = 1024 * 1024
+
+# Tar stream record size (must be a multiple of 512).  The stream layer
+# coalesces output into records of this size, so the encryption/progress
+# chain and the tape see ~1 MiB writes instead of 10 KiB ones.
+TAR_STREAM_BLOCKSIZE = 1024 * 1024
+
+
 class ProgressWriter:
-    """Wraps a file object to update a tqdm progress bar and optionally hash the stream."""
-    def __init__(self, wrapped_file, progress_bar, calc_hash=True):
+    """
+    Wraps a file object to update a tqdm progress bar and optionally hash the stream.
+
+    New unencrypted backups tag with BLAKE2b, which is 2-3x faster than
+    software SHA-256 for multi-GB streams.  Verification detects the
+    algorithm from the tag length (BLAKE2b hex tags are 128 chars vs 64
+    for SHA-256), so old SHA-256 manifests remain verifiable.
+    """
+    def __init__(self, wrapped_file, progress_bar, calc_hash=True, hash_algo="blake2b"):
         self._file = wrapped_file
         self._bar = progress_bar
-        self.sha256 = hashlib.sha256() if calc_hash else None
+        self.hasher = hashlib.new(hash_algo) if calc_hash else None
+        self._hash_buf = bytearray()
+        self._last_offset = 0
 
     def write(self, data):
         self._file.write(data)
-        self._bar.update(len(data))
-        if self.sha256:
-            self.sha256.update(data)
+
+        # Advance the bar from the underlying stream offset rather than
+        # len(data): stays byte-accurate when an inner layer buffers, and is
+        # clamped to the estimated total so the bar never drifts past 100%.
+        try:
+            offset = self._file.tell()
+        except (AttributeError, OSError):
+            offset = self._last_offset + len(data)
+        if self._bar.total is not None and offset > self._bar.total:
+            offset = self._bar.total
+        if offset > self._last_offset:
+            self._bar.update(offset - self._last_offset)
+            self._last_offset = offset
+
+        if self.hasher:
+            self._hash_buf += data
+            if len(self._hash_buf) >= HASH_BUFFER_SIZE:
+                self.hasher.update(memoryview(self._hash_buf))
+                self._hash_buf.clear()
+
+    def _drain_hash_buffer(self):
+        if self.hasher and self._hash_buf:
+            self.hasher.update(memoryview(self._hash_buf))
+            self._hash_buf.clear()
+
+    def hexdigest(self):
+        """Hex digest of everything written so far (drains the hash buffer)."""
+        self._drain_hash_buffer()
+        return self.hasher.hexdigest()
 
     def flush(self):
+        self._drain_hash_buffer()
         self._file.flush()
 
     def tell(self):
         return self._file.tell()
 
 
+class ThreadedWriter:
+    """
+    Pipelines writes through a bounded queue to a background thread.
+
+    The producing side (tar → encrypt → hash) keeps running while the worker
+    performs the blocking tape writes, overlapping CPU work with device
+    latency.  Worker errors are re-raised on the next write()/flush()/close().
+    close() drains the queue and joins the worker; it does NOT close the
+    underlying file.
+    """
+    def __init__(self, wrapped_file, queue_depth=8):
+        self._file = wrapped_file
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._error = None
+        self._enqueued = 0  # stream offset from the producer's perspective
+        self._worker = threading.Thread(target=self._drain, daemon=True)
+        self._worker.start()
+
+    def _drain(self):
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    break
+                if self._error is None:
+                    self._file.write(data)
+            except Exception as e:
+                self._error = e  # surfaced to the producer on its next call
+            finally:
+                self._queue.task_done()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, data):
+        self._check_error()
+        self._queue.put(bytes(data))
+        self._enqueued += len(data)
+
+    def tell(self):
+        return self._enqueued
+
+    def flush(self):
+        self._queue.join()
+        self._check_error()
+        self._file.flush()
+
+    def close(self):
+        """Drain pending writes and stop the worker (leaves the file open)."""
+        self._queue.put(None)
+        self._worker.join()
+        self._check_error()
+
+
 # =============================================================================
 # DIRECTORY SCANNING
 # =============================================================================
 
+# The scan is dominated by stat latency, not CPU, and scandir/stat release
+# the GIL — so threads overlap well, especially on network mounts/cold caches.
+SCAN_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+
+def _scan_one_dir(path, arcname):
+    """
+    Enumerate a single directory (non-recursive).
+
+    Returns (items, subdirs) where items is a list of entry tuples (see
+    _scan_directory) for the direct children and subdirs is a list of
+    (path, arcname) pairs for child directories still to be scanned.
+    Each entry is stat'ed exactly once via os.scandir.
+    """
+    items   = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except PermissionError:
+        print(f"Warning: Permission denied accessing {path}")
+        return items, subdirs
+
+    for entry in entries:
+        child_arcname = arcname + "/" + entry.name
+        st = entry.stat(follow_symlinks=False)
+        is_dir = stat.S_ISDIR(st.st_mode)
+        items.append((
+            entry.path, child_arcname, is_dir,
+            0 if is_dir else st.st_size,
+            0.0 if is_dir else st.st_mtime,
+        ))
+        if is_dir:
+            subdirs.append((entry.path, child_arcname))
+
+    return items, subdirs
+
+
+def iter_scan_directory(paths):
+    """
+    Lazily yield scan entries (same tuples as _scan_directory) depth-first,
+    children in sorted name order — parents always precede their children.
+
+    Memory-bound twin of _scan_directory: nothing is accumulated beyond the
+    directory stack, so peak usage is O(tree depth) instead of O(files).
+    Suitable for consumers that stream entries (size estimation, audits).
+    run_backup_job keeps the list-based scan because the full-state manifest
+    and the incremental diff both need every entry anyway.
+    """
+    pending = deque()
+
+    for p in paths:
+        st = os.stat(p)
+        is_dir = stat.S_ISDIR(st.st_mode)
+        yield (
+            p, os.path.basename(p), is_dir,
+            0 if is_dir else st.st_size,
+            0.0 if is_dir else st.st_mtime,
+        )
+        if is_dir:
+            pending.append((p, os.path.basename(p)))
+
+    while pending:
+        local_items, subdirs = _scan_one_dir(*pending.pop())
+        yield from local_items
+        pending.extend(reversed(subdirs))
+
+
 def _scan_directory(paths):
     """
-    Recursively walk all paths and return a flat list of entries.
+    Walk all paths and return a flat list of entries sorted by arcname.
 
     Each entry is a tuple:
         (abs_path, arcname, is_dir, size_bytes, mtime_float)
@@ -54,25 +251,53 @@ def _scan_directory(paths):
     arcname is the path relative to the backup root, always using forward
     slashes (e.g. "mydir/sub/file.txt"), suitable for use as a tar member name.
     mtime is 0.0 for directory entries.
+
+    Directories are fanned out across a ThreadPoolExecutor (one task per
+    directory; discovered subdirectories are fed back into the pool).  Small
+    trees are walked serially since pool overhead would outweigh the win.
+    Sorting by path components keeps the result deterministic regardless of
+    task completion order and, unlike a plain string sort, keeps every
+    subtree contiguous: a sibling like "docs.bak" would otherwise sort
+    between "docs" and "docs/…" ("." < "/") and split a directory from its
+    children.  The order equals a depth-first walk with name-sorted entries,
+    so parent directories always precede their children.
     """
     items = []
+    pending = deque()  # directories still to enumerate: (path, arcname)
 
-    def _walk(path, arcname):
-        is_dir = os.path.isdir(path)
-        size  = os.path.getsize(path) if not is_dir else 0
-        mtime = os.path.getmtime(path) if not is_dir else 0.0
-        items.append((path, arcname, is_dir, size, mtime))
-
-        if is_dir:
-            try:
-                for child in sorted(os.listdir(path)):
-                    _walk(os.path.join(path, child), arcname + "/" + child)
-            except PermissionError:
-                print(f"Warning: Permission denied accessing {path}")
-
+    # Root entries get the same single-stat treatment as scandir children:
+    # one os.stat per path instead of separate isdir/getsize/getmtime calls.
     for p in paths:
-        _walk(p, os.path.basename(p))
-
+        st = os.stat(p)
+        is_dir = stat.S_ISDIR(st.st_mode)
+        items.append((
+            p, os.path.basename(p), is_dir,
+            0 if is_dir else st.st_size,
+            0.0 if is_dir else st.st_mtime,
+        ))
+        if is_dir:
+            pending.append((p, os.path.basename(p)))
+
+    # Walk serially while there is no parallelism to exploit (a single
+    # pending directory at a time).  Deep-but-narrow trees never pay for
+    # the thread pool at all.
+    while len(pending) == 1:
+        local_items, subdirs = _scan_one_dir(*pending.pop())
+        items.extend(local_items)
+        pending.extend(subdirs)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            futures = {pool.submit(_scan_one_dir, p, a) for p, a in pending}
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    local_items, subdirs = fut.result()
+                    items.extend(local_items)
+                    for p, a in subdirs:
+                        futures.add(pool.submit(_scan_one_dir, p, a))
+
+    items.sort(key=lambda x: x[1].split("/"))
     return items
 
 
@@ -82,26 +307,68 @@ def _scan_directory(paths):
 
 def _get_previous_snapshot(tape, job_id):
     """
-    Load the manifest JSON for job_id from the tape and return a snapshot dict:
-        { arcname -> {"size": int, "mtime": float} }
+    Load the manifest for job_id from the tape and return a snapshot tuple:
+        (index, sizes, mtimes, hashes)
+    where index maps arcname -> position into the two parallel array.array
+    columns.  Storing sizes/mtimes as C-native columns instead of one small
+    dict per file cuts snapshot memory ~4x on million-file manifests and
+    keeps the hot comparison loop cache-friendly.
+
+    Prefers the compact MessagePack sidecar (job_{id}.mpk) when available —
+    C-level unpacking is several times faster than parsing the JSON for big
+    manifests — falling back to the JSON manifest otherwise.
+
+    The snapshot also carries a hashes dict (arcname -> sha256 hex) for
+    entries that have one — populated only by "rehash" verify-mode backups —
+    which the moved-file dedup uses to confirm content identity.
 
     Understands both the old manifest format (files have only "name") and the
     new format (files have "rel_path", "mtime").  Returns None on any failure.
     """
-    manifest_path = tape.mount_point / f"job_{job_id}.json"
-    if not manifest_path.exists():
-        return None
+    meta = None
+
+    if HAS_MSGPACK:
+        mpk_path = tape.mount_point / f"job_{job_id}.mpk"
+        if mpk_path.exists():
+            try:
+                with open(mpk_path, "rb") as f:
+                    meta = msgpack.unpack(f, raw=False)
+            except Exception:
+                meta = None
+
+    if meta is None:
+        manifest_path = tape.mount_point / f"job_{job_id}.json"
+        if not manifest_path.exists():
+            return None
     try:
-        with open(manifest_path, "r", encoding="utf-8") as f:
-            meta = json.load(f)
-        snapshot = {}
-        for entry in meta.get("files", []):
-            key = entry.get("rel_path") or entry.get("name", "")
-            snapshot[key] = {
-                "size":  entry.get("size", 0),
-                "mtime": entry.get("mtime", 0.0),
-            }
-        return snapshot
+        if meta is None:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        files  = meta.get("files", [])
+        index  = {}
+        sizes  = array("q")
+        mtimes = array("d")
+        hashes = {}
+
+        # Probe the schema once instead of chaining .get calls per entry:
+        # current manifests always carry rel_path/size/mtime, so the hot
+        # loop can use direct indexing (one C-level dict lookup per field).
+        if files and "rel_path" in files[0]:
+            for i, entry in enumerate(files):
+                arcname = entry["rel_path"]
+                index[arcname] = i
+                sizes.append(entry["size"])
+                mtimes.append(entry["mtime"])
+                h = entry.get("sha256")
+                if h:
+                    hashes[arcname] = h
+        else:
+            # Legacy manifests: files carry only "name" (size/mtime optional).
+            for entry in files:
+                index[entry.get("name", "")] = len(sizes)
+                sizes.append(entry.get("size", 0) or 0)
+                mtimes.append(entry.get("mtime", 0.0) or 0.0)
+        return index, sizes, mtimes, hashes
     except Exception:
         return None
 
@@ -115,11 +382,34 @@ def _filter_changed(all_items, snapshot):
       - Directories are always included (needed for tar to reconstruct structure).
       - A file is included if it is new (not in snapshot) or its size or mtime
         has changed (1-second tolerance for filesystem mtime precision).
+      - A "new" file confirmed (by content hash) to be a moved/renamed copy of
+        a file already on tape is recorded in moves (see _dedup_moved_files);
+        the caller keeps it in the job's index but excludes it from the tar.
 
     Returns:
-        changed_items  – list of items for the tar archive
-        stats          – {"new": int, "modified": int, "unchanged": int}
+        changed_items  – items for the job's node index and manifest
+                         (includes recorded moves)
+        stats          – {"new", "modified", "unchanged"[, "moved"]} counts
+        moves          – {new arcname: old arcname} for files whose content
+                         is already on tape under the old arcname
     """
+    index, sizes, mtimes, hashes = snapshot
+
+    if HAS_NUMPY and len(all_items) >= NUMPY_DIFF_THRESHOLD and len(sizes):
+        changed, stats = _filter_changed_numpy(all_items, index, sizes, mtimes)
+    else:
+        changed, stats = _filter_changed_python(all_items, snapshot)
+
+    moves = {}
+    if stats["new"] and hashes:
+        stats, moves = _dedup_moved_files(changed, stats, all_items, snapshot)
+
+    return changed, stats, moves
+
+
+def _filter_changed_python(all_items, snapshot):
+    """Plain interpreter loop behind _filter_changed (small scans)."""
+    index, sizes, mtimes, hashes = snapshot
     changed = []
     stats = {"new": 0, "modified": 0, "unchanged": 0}
 
@@ -129,11 +419,11 @@ def _filter_changed(all_items, snapshot):
             changed.append(entry)
             continue
 
-        prev = snapshot.get(arcname)
-        if prev is None:
+        i = index.get(arcname)
+        if i is None:
             changed.append(entry)
             stats["new"] += 1
-        elif size != prev["size"] or abs(mtime - prev.get("mtime", 0.0)) > 1.0:
+        elif size != sizes[i] or abs(mtime - mtimes[i]) > 1.0:
             changed.append(entry)
             stats["modified"] += 1
         else:
@@ -142,50 +432,173 @@ def _filter_changed(all_items, snapshot):
     return changed, stats
 
 
+def _filter_changed_numpy(all_items, index, sizes, mtimes):
+    """
+    Vectorized twin of _filter_changed for large scans.
+
+    One Python pass builds aligned position/size/mtime arrays; the actual
+    size/mtime comparison then runs as a couple of NumPy array ops instead
+    of a per-file interpreter loop.  Entries missing from the snapshot get
+    a -1 sentinel position and always flag as new.
+    """
+    n   = len(all_items)
+    get = index.get
+
+    pos        = np.fromiter((get(it[1], -1) for it in all_items), dtype=np.int64,   count=n)
+    cur_sizes  = np.fromiter((it[3] for it in all_items),          dtype=np.int64,   count=n)
+    cur_mtimes = np.fromiter((it[4] for it in all_items),          dtype=np.float64, count=n)
+    is_dir     = np.fromiter((bool(it[2]) for it in all_items),    dtype=bool,       count=n)
+
+    prev_sizes  = np.frombuffer(sizes,  dtype=np.int64)
+    prev_mtimes = np.frombuffer(mtimes, dtype=np.float64)
+
+    found    = pos >= 0
+    safe_pos = np.where(found, pos, 0)
+    differs  = (cur_sizes != prev_sizes[safe_pos]) | \
+               (np.abs(cur_mtimes - prev_mtimes[safe_pos]) > 1.0)
+
+    new_mask      = ~is_dir & ~found
+    modified_mask = ~is_dir & found & differs
+    include       = is_dir | new_mask | modified_mask
+
+    stats = {
+        "new":       int(new_mask.sum()),
+        "modified":  int(modified_mask.sum()),
+        "unchanged": int((~is_dir & found & ~differs).sum()),
+    }
+    changed = [all_items[i] for i in np.flatnonzero(include)]
+    return changed, stats
+
+
+def _file_sha256(path):
+    """SHA-256 hex digest of a file's content (confirms move candidates)."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for block in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+            h.update(block)
+        return h.hexdigest()
+
+
+def _dedup_moved_files(changed, stats, all_items, snapshot):
+    """
+    Whole-file dedup for renames and moves.
+
+    A file reported as new is matched against files that vanished from their
+    previous arcname.  (basename, size, mtime) only nominates a candidate;
+    the match is confirmed by hashing the candidate and comparing against
+    the vanished file's manifest SHA-256, so two distinct files with
+    identical metadata can never merge.  Only manifests written in "rehash"
+    verify mode carry those hashes — without them nothing is deduplicated
+    and moved files are archived like any new file.
+
+    A confirmed move is NOT dropped from the job: it stays in the node index
+    and the manifest (its entry records the old arcname under "moved_from",
+    which restore replays as a rename) — only its content is left out of the
+    tar, since the bytes already sit in an earlier archive of the chain.
+
+    Sub-file (content-defined chunk) dedup would need a different on-tape
+    format; whole-file matching captures the common rename/reorganisation
+    case within the existing one-tar-per-job layout.
+
+    Returns (stats, moves); changed itself is left untouched.
+    """
+    index, sizes, mtimes, hashes = snapshot
+    current = {arcname for _, arcname, _, _, _ in all_items}
+
+    vanished = {}  # (basename, size, int(mtime)) -> previous arcname
+    for arcname, i in index.items():
+        if sizes[i] > 0 and arcname not in current and arcname in hashes:
+            vanished[(arcname.rpartition("/")[2], sizes[i], int(mtimes[i]))] = arcname
+    if not vanished:
+        return stats, {}
+
+    moves = {}
+    for entry in changed:
+        abs_path, arcname, is_dir, size, mtime = entry
+        if is_dir or size <= 0 or arcname in index:
+            continue
+        key = (arcname.rpartition("/")[2], size, int(mtime))
+        old_arcname = vanished.get(key)
+        if old_arcname is None:
+            continue
+        try:
+            if _file_sha256(abs_path) != hashes[old_arcname]:
+                continue  # metadata collision, genuinely different content
+        except OSError:
+            continue  # unreadable now — archive it normally, don't merge
+        del vanished[key]  # each vanished file can satisfy one match
+        moves[arcname] = old_arcname
+
+    if moves:
+        stats = dict(stats, new=stats["new"] - len(moves), moved=len(moves))
+    return stats, moves
+
+
 # =============================================================================
 # NODE BUILDING
 # =============================================================================
 
-def _build_nodes_and_manifest(all_items, items_for_archive, key):
+def _build_nodes_and_manifest(all_items, items_for_index, key, moves=None):
     """
     Build the in-memory structures needed for the DB commit and the on-tape manifest.
 
     all_items        – complete directory scan; used for the manifest so it always
                        captures the full current state (previous unchanged files are
                        still referenced for the next incremental comparison).
-    items_for_archive – only the items that will actually be written to the tar
-                        archive (equals all_items for a full backup).
+    items_for_index  – the items this job records in the node index: the tar
+                       contents plus any confirmed moves (equals all_items for
+                       a full backup).
     key              – AES encryption key for filename encryption; None for plain.
+    moves            – {new arcname: old arcname} for files whose content is
+                       already on tape; their manifest entries are annotated
+                       with "moved_from" so restore can replay the rename.
 
     Returns:
         nodes          (list[NodeRecord]) – ready for _commit_file_index
         manifest_files (list[dict])       – full current-state file list for JSON
     """
     # ---- Full-state manifest (used as the snapshot for the next incremental) ----
-    manifest_files = []
-    for _, arcname, is_dir, size, mtime in all_items:
-        manifest_files.append({
+    # arcname.rpartition("/") does the basename split in one C-level call
+    # instead of the slower os.path helpers.
+    manifest_files = [
+        {
             "rel_path": arcname,
-            "name":     os.path.basename(arcname),
+            "name":     arcname.rpartition("/")[2],
             "is_dir":   is_dir,
             "size":     size,
             "mtime":    mtime,
-        })
-
-    # ---- DB nodes (only items going into this archive) ----
-    # Sort by arcname so parent directories always appear before their children.
-    arcname_to_idx = {}
+        }
+        for _, arcname, is_dir, size, mtime in all_items
+    ]
+
+    if moves:
+        by_path = {entry["rel_path"]: entry for entry in manifest_files}
+        for arcname, old_arcname in moves.items():
+            by_path[arcname]["moved_from"] = old_arcname
+
+    # ---- DB nodes (items recorded by this job) ----
+    # Items arrive sorted by path components from _scan_directory (and
+    # _filter_changed preserves that order), so each directory is immediately
+    # followed by its entire subtree — a parent is always on the open
+    # directory chain when its children arrive.  That lets a small stack
+    # resolve parents by string comparison instead of a per-entry dict lookup.
     nodes = []
+    dir_stack = []  # (arcname, node_idx) for each ancestor directory
 
-    for abs_path, arcname, is_dir, size, mtime in sorted(items_for_archive, key=lambda x: x[1]):
-        name            = os.path.basename(arcname)
-        parent_arcname  = os.path.dirname(arcname) or None
-        parent_idx      = arcname_to_idx.get(parent_arcname)
+    for abs_path, arcname, is_dir, size, mtime in items_for_index:
+        parent_arcname, _, name = arcname.rpartition("/")
+
+        while dir_stack and dir_stack[-1][0] != parent_arcname:
+            dir_stack.pop()
+        parent_idx = dir_stack[-1][1] if dir_stack else None
 
         name_stored = encrypt_name(name, key) if key else name
         idx = len(nodes)
         nodes.append(NodeRecord(parent_idx, name_stored, int(is_dir), size, mtime))
-        arcname_to_idx[arcname] = idx
+        if is_dir:
+            dir_stack.append((arcname, idx))
 
     return nodes, manifest_files
 
@@ -202,18 +615,71 @@ def _estimated_tar_size(items):
       - Each entry (file or directory) has a 512-byte header block.
       - File content is padded to the next 512-byte block boundary.
       - The archive ends with two 512-byte zero (end-of-archive) blocks.
+
+    Large item lists do the content+padding arithmetic as NumPy bulk ops.
+    """
+    if HAS_NUMPY and len(items) >= NUMPY_DIFF_THRESHOLD:
+        sizes = np.fromiter(
+            (size for _, _, is_dir, size, _ in items if not is_dir),
+            dtype=np.int64
+        )
+        total = int(sizes.sum() + (-sizes % 512).sum())  # content + block alignment
+    else:
+        total = 0
+        for _, _, is_dir, size, _ in items:
+            if not is_dir:
+                total += size + (512 - size % 512) % 512  # content + block alignment
+
+    total += len(items) * 512  # header blocks
+    total += 1024              # end-of-archive marker
+    return total
+
+
+# =============================================================================
+# ARCHIVE STREAMING
+# =============================================================================
+
+def _add_items_plain(tar, items):
+    """
+    Add items to the tar without per-file hashing.
+
+    True zero-copy (sendfile) is off the table here: tar framing and the
+    whole-stream digest both need the bytes in userspace.  What the kernel
+    CAN do for us is read ahead aggressively and drop pages we will never
+    touch again — multi-GB backups otherwise evict the page cache for the
+    rest of the system.
     """
-    total       = 0
-    entry_count = 0
+    for abs_path, arcname, _, _, _ in items:
+        tarinfo = tar.gettarinfo(abs_path, arcname=arcname)
+        if tarinfo.isreg():
+            with open(abs_path, "rb") as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                tar.addfile(tarinfo, f)
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        else:
+            tar.addfile(tarinfo)
 
-    for _, _, is_dir, size, _ in items:
-        entry_count += 1
-        if not is_dir:
-            total += size + (512 - size % 512) % 512  # content + block alignment
 
-    total += entry_count * 512  # header blocks
-    total += 1024               # end-of-archive marker
-    return total
+def _add_items_rehash(tar, items):
+    """
+    Add items to the tar while hashing each regular file's content as it is
+    read ("rehash" verify mode).  Returns {arcname: sha256_hex} for regular
+    files so the manifest can record per-file digests; a later run can use
+    them to detect silent source corruption that size+mtime would miss.
+    """
+    hashes = {}
+    for abs_path, arcname, _, _, _ in items:
+        tarinfo = tar.gettarinfo(abs_path, arcname=arcname)
+        if tarinfo.isreg():
+            with open(abs_path, "rb") as f:
+                reader = HashReader(f)
+                tar.addfile(tarinfo, reader)
+            hashes[arcname] = reader.get_hash()
+        else:
+            tar.addfile(tarinfo)
+    return hashes
 
 
 # =============================================================================
@@ -223,30 +689,59 @@ def _estimated_tar_size(items):
 def _commit_file_index(db, tape_id, job_id, nodes):
     """
     Bulk-insert all NodeRecords into the database in a single transaction.
-    Converts list-index parent references into real DB row ids.
+
+    Row ids are pre-assigned from the table's current MAX(id), so list-index
+    parent references resolve to real ids up front and the whole index lands
+    in one executemany instead of one cursor round-trip per node.
     Called only after the tape archive has been written successfully.
     """
-    id_map = {}  # list index -> DB row id
-    db.conn.execute("BEGIN")
-    for idx, node in enumerate(nodes):
-        parent_db_id = id_map.get(node.parent_idx)  # None for root entries
-        db_id = db.insert_node(
-            tape_id, parent_db_id, node.name_stored,
-            node.is_dir, node.size, job_id, node.mtime
+    base = db.next_node_id(tape_id)
+
+    rows = [
+        (
+            base + idx,
+            base + node.parent_idx if node.parent_idx is not None else None,
+            node.name_stored, node.is_dir, node.size, node.mtime, job_id,
         )
-        id_map[idx] = db_id
-    db.conn.commit()
+        for idx, node in enumerate(nodes)
+    ]
+
+    db.insert_nodes_bulk(tape_id, rows)
 
 
 # =============================================================================
 # MANIFEST PERSISTENCE
 # =============================================================================
 
+# Manifests with more files than this are written compact and streamed;
+# smaller ones stay pretty-printed for easy inspection on the tape.
+MANIFEST_PRETTY_LIMIT = 10_000
+
+
 def save_job_metadata_to_tape(tape, job_id, meta_dict):
-    """Write a lightweight JSON manifest to the tape alongside the archive."""
+    """
+    Write a lightweight JSON manifest to the tape alongside the archive.
+
+    Small manifests are pretty-printed (indent=2).  Large ones skip the slow
+    Python-level pretty printer and are emitted compact, chunk by chunk via
+    iterencode, so no full-document string is materialized in memory.
+    """
     json_path = tape.mount_point / f"job_{job_id}.json"
     with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(meta_dict, f, indent=2, ensure_ascii=False)
+        if len(meta_dict.get("files", [])) > MANIFEST_PRETTY_LIMIT:
+            encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+            for chunk in encoder.iterencode(meta_dict):
+                f.write(chunk)
+        else:
+            json.dump(meta_dict, f, indent=2, ensure_ascii=False)
+
+    # Compact binary sidecar: loaded preferentially by the next incremental
+    # run (_get_previous_snapshot).  Purely an accelerator — recovery and
+    # restore only ever read the JSON manifest.
+    if HAS_MSGPACK:
+        with open(tape.mount_point / f"job_{job_id}.mpk", "wb") as f:
+            msgpack.pack(meta_dict, f)
+
     return json_path
 
 
@@ -254,7 +749,8 @@ def save_job_metadata_to_tape(tape, job_id, meta_dict):
 # MAIN ENTRY POINT
 # =============================================================================
 
-def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=False):
+def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=False,
+                   verify_mode="fast"):
     """
     Execute a backup job writing to tape_id.
 
@@ -268,6 +764,10 @@ def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=Fa
     incremental : when True, only new/changed files are archived; the user is
                   shown a diff summary and asked to confirm before proceeding.
                   If no previous backup exists the job falls back to FULL.
+    verify_mode : "fast" (default) trusts size+mtime as the change oracle and
+                  never hashes source files.  "rehash" additionally computes a
+                  per-file SHA-256 while streaming into the tar and records it
+                  in the manifest, so silent corruption can be detected later.
 
     Returns the new job_id, or None if the user cancelled an incremental run.
     """
@@ -279,6 +779,8 @@ def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=Fa
 
     # --- 2. Incremental: diff against previous snapshot ------------------------
     items_for_archive = all_items
+    items_for_index   = all_items
+    moves = {}
     backup_type = "FULL"
 
     if incremental:
@@ -296,12 +798,14 @@ def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=Fa
             if snapshot is None:
                 console.print("[yellow]Previous manifest unreadable — performing full backup.[/]")
             else:
-                changed, stats = _filter_changed(all_items, snapshot)
-                file_delta = stats["new"] + stats["modified"]
+                changed, stats, moves = _filter_changed(all_items, snapshot)
+                file_delta = stats["new"] + stats["modified"] + stats.get("moved", 0)
 
                 console.print("\n[bold]Incremental Analysis[/]")
                 console.print(f"  [green]New files    :[/]  {stats['new']}")
                 console.print(f"  [yellow]Modified files:[/]  {stats['modified']}")
+                if stats.get("moved"):
+                    console.print(f"  [cyan]Moved (deduped):[/]  {stats['moved']}")
                 console.print(f"  [dim]Unchanged    :[/]  {stats['unchanged']}")
 
                 if file_delta == 0:
@@ -311,7 +815,12 @@ def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=Fa
                 if not confirm(f"Proceed with incremental backup of {file_delta} file(s)?"):
                     return None
 
-                items_for_archive = changed
+                # Confirmed moves stay in the index and manifest but their
+                # content is already on tape — only the tar skips them.
+                items_for_index   = changed
+                items_for_archive = (
+                    [e for e in changed if e[1] not in moves] if moves else changed
+                )
                 backup_type = "INCREMENTAL"
 
     # --- 3. Capacity pre-check --------------------------------------------------
@@ -339,7 +848,9 @@ def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=Fa
 
     # --- 6. Build nodes and manifest in memory ---------------------------------
     print("Indexing files...")
-    nodes, manifest_files = _build_nodes_and_manifest(all_items, items_for_archive, key)
+    nodes, manifest_files = _build_nodes_and_manifest(
+        all_items, items_for_index, key, moves
+    )
 
     job_manifest = {
         "job_id":      job_id,
@@ -360,28 +871,48 @@ def run_backup_job(db, tape_id, paths, key=None, generation="L5", incremental=Fa
     try:
         with tape.get_writer(job_id, encrypted=(key is not None)) as raw_tape_file:
             pbar = tqdm(total=tar_estimated, unit="B", unit_scale=True, desc="Backup & Sync")
-            progress_writer = ProgressWriter(raw_tape_file, pbar, calc_hash=(key is None))
-
-            enc_writer   = None
-            final_writer = progress_writer
-            if key:
-                enc_writer   = EncryptionWriter(progress_writer, key, iv)
-                final_writer = enc_writer
-
-            with tarfile.open(fileobj=final_writer, mode="w|") as tar:
-                for abs_path, arcname, _, _, _ in items_for_archive:
-                    # recursive=False because we already have every item in the list
-                    tar.add(abs_path, arcname=arcname, recursive=False)
-
-            # Finalise crypto and capture authentication tag
-            if enc_writer:
-                tag_hex = enc_writer.finalize().hex()
-                job_manifest["crypto"]["tag_hex"] = tag_hex
-            elif progress_writer.sha256:
-                tag_hex = progress_writer.sha256.hexdigest()
-                job_manifest["crypto"]["tag_hex"] = tag_hex
-
-            pbar.close()
+
+            # Tape writes run on a background thread so tar building,
+            # hashing and encryption overlap with device latency.
+            tape_writer     = ThreadedWriter(raw_tape_file)
+            progress_writer = ProgressWriter(tape_writer, pbar, calc_hash=(key is None))
+
+            try:
+                enc_writer   = None
+                final_writer = progress_writer
+                if key:
+                    # Encryption on its own thread: tar building overlaps
+                    # with GCM, which overlaps with the tape writer thread.
+                    enc_writer   = ThreadedEncryptionWriter(progress_writer, key, iv)
+                    final_writer = enc_writer
+
+                file_hashes = None
+                with tarfile.open(fileobj=final_writer, mode="w|",
+                                  bufsize=TAR_STREAM_BLOCKSIZE,
+                                  copybufsize=TAR_COPY_BUFSIZE) as tar:
+                    if verify_mode == "rehash":
+                        file_hashes = _add_items_rehash(tar, items_for_archive)
+                    else:
+                        _add_items_plain(tar, items_for_archive)
+
+                if file_hashes:
+                    for entry in manifest_files:
+                        h = file_hashes.get(entry["rel_path"])
+                        if h:
+                            entry["sha256"] = h
+
+                # Finalise crypto and capture authentication tag
+                if enc_writer:
+                    tag_hex = enc_writer.finalize().hex()
+                    job_manifest["crypto"]["tag_hex"] = tag_hex
+                elif progress_writer.hasher:
+                    tag_hex = progress_writer.hexdigest()
+                    job_manifest["crypto"]["tag_hex"] = tag_hex
+
+            finally:
+                # Join the writer thread before the file handle closes.
+                tape_writer.close()
+                pbar.close()
 
         # --- 8. Commit index only after archive succeeded ----------------------
         # If the archive step raised, this block is skipped and the DB stays clean.
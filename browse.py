@@ -37,7 +37,9 @@ def browse(db, tape_id, key=None):
     # ---- File index tree -------------------------------------------------------
     console.print("\n[bold yellow]File Index:[/]")
     rows = db.conn.execute(
-        f"SELECT id, parent_id, name, is_dir, size FROM tape_{tape_id} ORDER BY id"
+        "SELECT id, parent_id, name, is_dir, size FROM nodes "
+        "WHERE tape_id=? ORDER BY id",
+        (tape_id,)
     ).fetchall()
 
     if not rows:
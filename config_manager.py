@@ -1,16 +1,32 @@
 import json
 import os
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 class ConfigManager:
     def __init__(self, config_path="config.json", ext_path="extensions.json"):
         self.config_path = config_path
         self.ext_path = ext_path
         self.config = self._load_json(config_path)
         self.extensions = self._load_json(ext_path)
+        # Icon lookups run once per displayed node; resolve the nested
+        # dicts here so the hot path is a single dict get.
+        self._icon_map     = self.extensions.get("ext", {})
+        self._default_icon = self.extensions.get("default", "📄")
+        self._folder_icon  = self.extensions.get("folder", "📁")
+        self._gen_cache    = {}
+        self._root_path    = None
 
     def _load_json(self, path):
         if not os.path.exists(path):
             raise FileNotFoundError(f"Configuration file {path} not found.")
+        if HAS_ORJSON:
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
         with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
@@ -18,30 +34,36 @@ class ConfigManager:
         return self.config.get(key, default)
 
     def get_generation_info(self, gen_code):
-        gens = self.config.get("generations", {})
-        return gens.get(gen_code, gens.get("L5"))  # Default to L5
+        # Called once per tape/job in listings; skip the double dict walk.
+        # Cardinality is tiny (L5–L9), so the cache hit rate is ~100% and
+        # callers never need their own per-loop caching.
+        info = self._gen_cache.get(gen_code)
+        if info is None:
+            gens = self.config.get("generations", {})
+            info = gens.get(gen_code, gens.get("L5"))  # Default to L5
+            self._gen_cache[gen_code] = info
+        return info
 
     def get_root_path(self):
         """Returns the actual path to write/read data based on debug mode."""
+        if self._root_path is not None:
+            return self._root_path
         if self.config.get("debug_mode", False):
             path = self.config.get("local_debug_path", "local_tape_storage")
             os.makedirs(path, exist_ok=True)
-            return path
         else:
-            # Check if drive letter exists
-            drive = self.config.get("drive_letter", "T:\\")
-            if not os.path.exists(drive):
-                # Only raise warning if not in debug, let system handle IO error later
-                pass 
-            return drive
+            # In real mode the drive may not be mounted yet; let the IO
+            # layer surface any error when it actually opens files.
+            path = self.config.get("drive_letter", "T:\\")
+        self._root_path = path
+        return path
 
     def get_file_icon(self, is_dir, filename):
         if is_dir:
-            return self.extensions.get("folder", "📁")
-        
-        _, ext = os.path.splitext(filename.lower())
-        icon_map = self.extensions.get("ext", {})
-        return icon_map.get(ext, self.extensions.get("default", "📄"))
+            return self._folder_icon
+        # Lowercase only the extension, not a copy of the whole filename.
+        ext = os.path.splitext(filename)[1].lower()
+        return self._icon_map.get(ext, self._default_icon)
 
 # Global instance
 cfg = ConfigManager()
\ No newline at end of file
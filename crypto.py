@@ -1,11 +1,19 @@
 import os
 import base64
 import hashlib
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+import mmap
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, x25519
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from cryptography.fernet import Fernet
 
 # =========================
@@ -16,24 +24,105 @@ from cryptography.fernet import Fernet
 # PBKDF2-HMAC-SHA256.  Updating from the previous 200,000.
 PBKDF2_ITERATIONS = 600_000
 
-def derive_key(passphrase: bytes, salt: bytes) -> bytes:
-    """Derive a 32-byte (256-bit) key from a passphrase using PBKDF2-HMAC-SHA256."""
+# The raised iteration count is only affordable because derivation runs in
+# OpenSSL's C EVP path, which reuses the HMAC ipad/opad context per round.
+# Fail loudly at import if a non-OpenSSL backend ever sneaks in — a
+# pure-Python fallback would make every tape unlock take tens of seconds.
+if getattr(default_backend(), "name", "openssl") != "openssl":
+    raise RuntimeError(
+        "crypto requires the OpenSSL backend for PBKDF2 "
+        f"({PBKDF2_ITERATIONS} iterations); got: {default_backend().name!r}"
+    )
+
+def _derive_block(passphrase: bytes, salt: bytes, block_index: int) -> bytes:
+    """One independent 32-byte block: PBKDF2-HMAC-SHA256 over salt || INT(i)."""
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
-        salt=salt,
+        salt=salt + block_index.to_bytes(4, "big"),
         iterations=PBKDF2_ITERATIONS,
         backend=default_backend()
     )
     return kdf.derive(passphrase)
 
+
+def derive_key(passphrase: bytes, salt: bytes, length: int = 32) -> bytes:
+    """
+    Derive `length` key bytes from a passphrase using PBKDF2-HMAC-SHA256.
+
+    The default 32-byte request is plain single-block PBKDF2 — byte-for-byte
+    identical to what every existing tape was configured with.  Longer keys
+    (e.g. a combined AES+HMAC key) are assembled from independent 32-byte
+    blocks derived over salt || INT(i); because each block costs the full
+    iteration count, blocks are fanned out across a process pool for
+    near-linear speedup up to length/32 cores.
+    """
+    if length <= 32:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=length,
+            salt=salt,
+            iterations=PBKDF2_ITERATIONS,
+            backend=default_backend()
+        )
+        return kdf.derive(passphrase)
+
+    nblocks = -(-length // 32)
+    with ProcessPoolExecutor(max_workers=min(nblocks, os.cpu_count() or 1)) as pool:
+        blocks = pool.map(
+            _derive_block,
+            [passphrase] * nblocks, [salt] * nblocks, range(1, nblocks + 1)
+        )
+    return b"".join(blocks)[:length]
+
+
+# scrypt defaults for newly configured tapes.  Memory-hard: an attacker has
+# to pay ~N*r*128 bytes (32 MiB here) per guess, which GPUs/ASICs cannot
+# amortize the way they do PBKDF2's pure iteration count — so the legitimate
+# unlock can be much cheaper in wall-clock time for the same attacker cost.
+# Existing tapes carry no kdf_params row and stay on PBKDF2 forever.
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+def derive_key_scrypt(passphrase: bytes, salt: bytes, n: int,
+                      r: int = SCRYPT_R, p: int = SCRYPT_P,
+                      length: int = 32) -> bytes:
+    """Derive `length` key bytes with scrypt using explicit cost parameters."""
+    kdf = Scrypt(salt=salt, length=length, n=n, r=r, p=p,
+                 backend=default_backend())
+    return kdf.derive(passphrase)
+
+
+def calibrate_scrypt(target_seconds: float = 0.25) -> int:
+    """
+    Pick the largest power-of-two scrypt N that derives a key within roughly
+    `target_seconds` on this host.  Run once when a tape is configured; the
+    result is stored with the tape so unlocks on slower hosts still work.
+    """
+    import time
+    n = 2 ** 14  # 16 MiB floor — never go below this even on slow hosts
+    while n < 2 ** 20:
+        start = time.perf_counter()
+        derive_key_scrypt(b"calibration", b"\x00" * 16, n)
+        if time.perf_counter() - start > target_seconds / 2:
+            break
+        n *= 2
+    return n
+
 # =========================
 # STREAMING ENCRYPTION WRAPPERS
 # =========================
 
+# Plaintext is coalesced to this size before each C-level GCM update call.
+# AES-NI/PCLMUL throughput is only reached with multi-KB blocks; per-512-byte
+# tar writes would be dominated by Python-to-C call overhead instead.
+ENC_BUFFER_SIZE = 1024 * 1024
+
 class EncryptionWriter:
     """
     Streaming AES-GCM Encryption.
+    Buffers plaintext into large blocks before handing it to the C backend.
     Calculates the Auth Tag upon finalization.
     """
     def __init__(self, wrapped_file, key: bytes, iv: bytes):
@@ -41,59 +130,219 @@ class EncryptionWriter:
         # GCM mode initialization (12-byte IV recommended)
         self._cipher = Cipher(algorithms.AES(key), modes.GCM(iv), backend=default_backend())
         self._encryptor = self._cipher.encryptor()
-        self.tag = None 
+        self._buf = bytearray()
+        self.tag = None
 
     def write(self, data: bytes):
         if not data: return
-        self._file.write(self._encryptor.update(data))
+        self._buf += data
+        if len(self._buf) >= ENC_BUFFER_SIZE:
+            self._file.write(self._encryptor.update(bytes(self._buf)))
+            self._buf.clear()
+
+    def _drain(self):
+        if self._buf:
+            self._file.write(self._encryptor.update(bytes(self._buf)))
+            self._buf.clear()
 
     def finalize(self):
         """Must be called to generate the authentication tag."""
+        self._drain()
         self._encryptor.finalize()
         self.tag = self._encryptor.tag
         return self.tag
 
     def flush(self):
+        self._drain()
         self._file.flush()
-    
+
     def tell(self):
         return self._file.tell()
 
+class ThreadedEncryptionWriter:
+    """
+    Runs AES-GCM on a background thread.
+
+    OpenSSL releases the GIL inside update(), so a dedicated encryptor
+    thread genuinely overlaps with the producer: tar building fills the
+    bounded queue while ciphertext drains toward the tape writer.  Same
+    write/flush/finalize/tell surface as EncryptionWriter.
+    """
+    def __init__(self, wrapped_file, key: bytes, iv: bytes, queue_depth=4):
+        self._inner = EncryptionWriter(wrapped_file, key, iv)
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._error = None
+        self.tag = None
+        self._worker = threading.Thread(
+            target=self._drain, name="gcm-encryptor", daemon=True
+        )
+        self._worker.start()
+
+    def _drain(self):
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None:
+                    self._inner.write(chunk)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, data: bytes):
+        if not data: return
+        self._check_error()
+        # Copy: the producer may reuse its buffer after write() returns.
+        self._queue.put(bytes(data))
+
+    def flush(self):
+        self._queue.join()
+        self._check_error()
+        self._inner.flush()
+
+    def finalize(self):
+        """Joins the encryptor thread, then seals the stream for the tag."""
+        self._queue.put(None)
+        self._worker.join()
+        self._check_error()
+        self.tag = self._inner.finalize()
+        return self.tag
+
+    def tell(self):
+        return self._inner.tell()
+
+class HashingEncryptionWriter(EncryptionWriter):
+    """
+    EncryptionWriter that also digests the plaintext in the same pass.
+
+    Today backups either hash (plain jobs) or encrypt (AES-GCM jobs, where
+    the auth tag covers integrity) — never both.  If a job ever needs a
+    content hash alongside encryption, this walks each buffer once via a
+    memoryview instead of re-reading the source files a second time.
+    """
+    def __init__(self, wrapped_file, key: bytes, iv: bytes, hash_algo="blake2b"):
+        super().__init__(wrapped_file, key, iv)
+        self._hash = hashlib.new(hash_algo)
+
+    def write(self, data: bytes):
+        if not data: return
+        with memoryview(data) as view:
+            self._hash.update(view)
+            super().write(view)
+
+    def get_hash(self):
+        return self._hash.hexdigest()
+
 class DecryptionReader:
     """
     Streaming AES-GCM Decryption.
     Validates integrity on the fly (at EOF).
+
+    Reads from the underlying file in large refills regardless of the
+    caller's request size: tarfile asks for 512-byte headers, and pushing
+    each of those through a separate GCM update call wastes most of the
+    time on Python-to-C overhead.  Decrypted data is served out of an
+    internal buffer instead.
     """
+    _REFILL_SIZE = 1024 * 1024
+
     def __init__(self, wrapped_file, key: bytes, iv: bytes, tag: bytes):
         self._file = wrapped_file
         self._cipher = Cipher(algorithms.AES(key), modes.GCM(iv, tag), backend=default_backend())
         self._decryptor = self._cipher.decryptor()
+        self._buf = bytearray()
+        self._eof = False
+
+    def _fill(self, want: int):
+        """Refill the plaintext buffer until it holds `want` bytes or EOF."""
+        while not self._eof and len(self._buf) < want:
+            data = self._file.read(max(want, self._REFILL_SIZE))
+            if not data:
+                self._eof = True
+                # EOF reached: finalize to verify tag
+                try:
+                    self._decryptor.finalize()
+                except Exception as e:
+                    raise ValueError("Integrity check failed! Data corrupted or tampered.") from e
+                break
+            self._buf += self._decryptor.update(data)
 
     def read(self, size=-1):
-        data = self._file.read(size)
-        if not data:
-            # EOF reached: finalize to verify tag
-            try:
-                self._decryptor.finalize()
-                return b""
-            except Exception as e:
-                raise ValueError("Integrity check failed! Data corrupted or tampered.") from e
-        
-        return self._decryptor.update(data)
-    
+        if size is None or size < 0:
+            while not self._eof:
+                self._fill(len(self._buf) + self._REFILL_SIZE)
+            out = bytes(self._buf)
+            self._buf.clear()
+            return out
+
+        self._fill(size)
+        out = bytes(self._buf[:size])
+        del self._buf[:size]
+        return out
+
+    def readinto(self, buf):
+        """
+        Fill `buf` with plaintext; returns the byte count (0 at EOF).
+
+        For consume-and-discard callers (verify) this recycles one
+        caller-owned buffer instead of allocating a bytes object per
+        chunk — on a 100 GB job that is ~100k allocations avoided.
+        """
+        want = len(buf)
+        self._fill(want)
+        n = min(want, len(self._buf))
+        buf[:n] = self._buf[:n]
+        del self._buf[:n]
+        return n
+
 class HashReader:
     """
-    Passthrough reader that calculates SHA256 of the stream.
+    Passthrough reader that calculates a digest of the stream.
+    Defaults to SHA-256; newer backups tag with BLAKE2b (128-char hex tags).
+
+    Small caller reads (tar headers) are coalesced into >=1 MiB reads of
+    the underlying file so the digest advances in a few large C calls
+    instead of thousands of 512-byte ones.
     """
-    def __init__(self, wrapped_file):
+    _MIN_READ = 1024 * 1024
+
+    def __init__(self, wrapped_file, algo="sha256"):
         self._file = wrapped_file
-        self._hash = hashlib.sha256()
+        self._hash = hashlib.new(algo)
+        self._buf = bytearray()
 
     def read(self, size=-1):
-        data = self._file.read(size)
-        if data:
+        if size is None or size < 0:
+            data = self._file.read()
+            if data:
+                self._hash.update(data)
+            out = bytes(self._buf) + data
+            self._buf.clear()
+            return out
+
+        # Fast path: nothing buffered and the caller already reads big.
+        if not self._buf and size >= self._MIN_READ:
+            data = self._file.read(size)
+            if data:
+                self._hash.update(data)
+            return data
+
+        while len(self._buf) < size:
+            data = self._file.read(self._MIN_READ)
+            if not data:
+                break
             self._hash.update(data)
-        return data
+            self._buf += data
+
+        out = bytes(self._buf[:size])
+        del self._buf[:size]
+        return out
 
     def get_hash(self):
         return self._hash.hexdigest()
@@ -101,15 +350,41 @@ class HashReader:
     def close(self):
         self._file.close()
 
+class DualHasher:
+    """
+    Hashes two independent streams (e.g. plaintext and ciphertext of the same
+    backup) behind a single interface.  Interleaving the two lanes keeps the
+    CPU's hash pipeline fuller than finishing one stream before the other;
+    a multibuffer SHA kernel could replace the two hashlib objects later
+    without touching callers.
+    """
+    def __init__(self, algo="sha256"):
+        self._lane_a = hashlib.new(algo)
+        self._lane_b = hashlib.new(algo)
+
+    def update(self, data_a, data_b):
+        """Feed one buffer into each lane (either may be empty)."""
+        if data_a:
+            self._lane_a.update(data_a)
+        if data_b:
+            self._lane_b.update(data_b)
+
+    def hexdigests(self):
+        """Returns (lane_a_hex, lane_b_hex)."""
+        return self._lane_a.hexdigest(), self._lane_b.hexdigest()
+
 # =========================
 # RSA & STATIC HELPERS
 # =========================
 
-def generate_rsa_keypair(output_dir: str) -> bytes:
-    """Generate RSA key pair and save to disk."""
-    os.makedirs(output_dir, exist_ok=True)
+def generate_rsa_keypair_pems() -> tuple:
+    """
+    Generate an RSA key pair and return (private_pem, public_pem) without
+    touching disk — safe to run speculatively on a worker thread before
+    the user has committed to RSA encryption.
+    """
     private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-    
+
     private_pem = private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
         format=serialization.PrivateFormat.TraditionalOpenSSL,
@@ -119,17 +394,36 @@ def generate_rsa_keypair(output_dir: str) -> bytes:
         encoding=serialization.Encoding.PEM,
         format=serialization.PublicFormat.SubjectPublicKeyInfo
     )
+    return private_pem, public_pem
 
+
+def save_rsa_keypair(output_dir: str, private_pem: bytes, public_pem: bytes) -> None:
+    """Write a generated key pair to private.pem/public.pem in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
     with open(os.path.join(output_dir, "private.pem"), "wb") as f:
         f.write(private_pem)
     with open(os.path.join(output_dir, "public.pem"), "wb") as f:
         f.write(public_pem)
-    
+
+
+def generate_rsa_keypair(output_dir: str) -> bytes:
+    """Generate RSA key pair and save to disk."""
+    private_pem, public_pem = generate_rsa_keypair_pems()
+    save_rsa_keypair(output_dir, private_pem, public_pem)
     return public_pem
 
+@lru_cache(maxsize=4)
+def _load_public_key(public_pem: bytes):
+    # PEM parsing walks the ASN.1 structure every call; the system only
+    # ever deals with one or two keypairs, so cache the parsed objects.
+    return serialization.load_pem_public_key(public_pem)
+
+@lru_cache(maxsize=4)
+def _load_private_key(private_pem: bytes):
+    return serialization.load_pem_private_key(private_pem, password=None)
+
 def encrypt_symmetric_key(sym_key: bytes, public_pem: bytes) -> bytes:
-    public_key = serialization.load_pem_public_key(public_pem)
-    return public_key.encrypt(
+    return _load_public_key(public_pem).encrypt(
         sym_key,
         padding.OAEP(
             mgf=padding.MGF1(algorithm=hashes.SHA256()),
@@ -139,8 +433,7 @@ def encrypt_symmetric_key(sym_key: bytes, public_pem: bytes) -> bytes:
     )
 
 def decrypt_symmetric_key(enc_key: bytes, private_pem: bytes) -> bytes:
-    private_key = serialization.load_pem_private_key(private_pem, password=None)
-    return private_key.decrypt(
+    return _load_private_key(private_pem).decrypt(
         enc_key,
         padding.OAEP(
             mgf=padding.MGF1(algorithm=hashes.SHA256()),
@@ -149,15 +442,149 @@ def decrypt_symmetric_key(enc_key: bytes, private_pem: bytes) -> bytes:
         )
     )
 
+def hash_files_merkle(paths) -> str:
+    """
+    One SHA-256 digest over many files' names, sizes and contents.
+
+    For manifests that only need a root digest (not per-file hashes),
+    feeding every file into a single hasher via mmap beats N independent
+    read loops: no per-file Python reader objects, and SHA-NI runs over
+    large contiguous buffers.  Name and size are folded in with a NUL
+    delimiter so reordering or boundary-shifting between files cannot
+    produce the same root.
+    """
+    h = hashlib.sha256()
+    for path in paths:
+        st = os.stat(path)
+        h.update(os.fsencode(path) + b"\x00" + str(st.st_size).encode() + b"\x00")
+        if st.st_size == 0:
+            continue
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(memoryview(mm))
+    return h.hexdigest()
+
+def wrap_symmetric_key_x25519(sym_key: bytes, recipient_pub: bytes) -> bytes:
+    """
+    Wrap a symmetric key for an X25519 recipient (raw 32-byte public key).
+
+    Ephemeral ECDH + HKDF-SHA256 + AES-GCM: one curve scalar-mult (~50 µs)
+    versus ~1 ms for an RSA-OAEP-2048 encrypt, so unlocking many tapes in
+    a row stays sub-millisecond each.  Output layout is
+    ephemeral_pub(32) || nonce(12) || ciphertext+tag.  The RSA path stays
+    for tapes keyed before this existed.
+    """
+    eph_priv = x25519.X25519PrivateKey.generate()
+    shared = eph_priv.exchange(x25519.X25519PublicKey.from_public_bytes(recipient_pub))
+    kek = HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=None,
+        info=b"lto-keywrap-x25519",
+    ).derive(shared)
+    nonce = os.urandom(12)
+    ct = AESGCM(kek).encrypt(nonce, sym_key, None)
+    eph_pub = eph_priv.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+    return eph_pub + nonce + ct
+
+def unwrap_symmetric_key_x25519(wrapped: bytes, recipient_priv: bytes) -> bytes:
+    """Inverse of wrap_symmetric_key_x25519 (raw 32-byte private key)."""
+    eph_pub, nonce, ct = wrapped[:32], wrapped[32:44], wrapped[44:]
+    priv = x25519.X25519PrivateKey.from_private_bytes(recipient_priv)
+    shared = priv.exchange(x25519.X25519PublicKey.from_public_bytes(eph_pub))
+    kek = HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=None,
+        info=b"lto-keywrap-x25519",
+    ).derive(shared)
+    return AESGCM(kek).decrypt(nonce, ct, None)
+
 def sha256_hex(data: bytes) -> str:
+    # hashlib dispatches to OpenSSL, which uses the SHA-NI instructions
+    # where the CPU has them — a 32-byte key hashes in a single hardware
+    # block.  Don't replace this with anything "clever".
     return hashlib.sha256(data).hexdigest()
 
+def sha256_bytes(data: bytes) -> bytes:
+    """Raw 32-byte digest — for BLOB storage, where hex would double the size."""
+    return hashlib.sha256(data).digest()
+
+def sha256_hex_stream(readable, chunk=1 << 20) -> str:
+    """
+    SHA-256 of a readable stream without materialising it.
+
+    Reuses one chunk-sized bytearray via readinto, so hashing a stream of
+    any length allocates a single buffer — use this instead of
+    sha256_hex(f.read()) for anything that might be large.
+    """
+    h = hashlib.sha256()
+    buf = bytearray(chunk)
+    view = memoryview(buf)
+    while True:
+        n = readable.readinto(buf)
+        if not n:
+            break
+        h.update(view[:n])
+    return h.hexdigest()
+
+@lru_cache(maxsize=8)
+def _fernet(key: bytes) -> Fernet:
+    # Constructing a Fernet re-derives its signing/encryption subkeys each
+    # time; caching per raw AES key amortises that across the thousands of
+    # filename operations in a browse or restore session.
+    return Fernet(base64.urlsafe_b64encode(key))
+
+@lru_cache(maxsize=8)
+def _name_cipher(key: bytes) -> AESGCM:
+    return AESGCM(key)
+
+# Domain separator so filename nonces can never collide with any other
+# SHA-256 use of the same plaintext elsewhere in the system.
+_NAME_NONCE_SALT = b"lto-name-v1:"
+
 def encrypt_name(name: str, key: bytes) -> str:
-    # Use Fernet for small string encryption (filenames)
-    # Adapt raw AES key to Fernet url-safe key
-    f_key = base64.urlsafe_b64encode(key)
-    return Fernet(f_key).encrypt(name.encode()).decode()
+    """
+    Encrypt a filename with AES-GCM and a deterministic nonce.
+
+    The nonce is derived from the plaintext, so the same name under the
+    same key always produces the same token — a deliberate trade (it
+    reveals name equality, which the old Fernet tokens hid) that lets
+    repeated names dedupe and skips Fernet's HMAC+timestamp overhead.
+    """
+    data = name.encode()
+    nonce = hashlib.sha256(_NAME_NONCE_SALT + data).digest()[:12]
+    ct = _name_cipher(key).encrypt(nonce, data, None)
+    return base64.urlsafe_b64encode(nonce + ct).decode()
 
 def decrypt_name(enc_name: str, key: bytes) -> str:
-    f_key = base64.urlsafe_b64encode(key)
-    return Fernet(f_key).decrypt(enc_name.encode()).decode()
\ No newline at end of file
+    try:
+        raw = base64.urlsafe_b64decode(enc_name.encode())
+        return _name_cipher(key).decrypt(raw[:12], raw[12:], None).decode()
+    except Exception:
+        # Tokens written before the AES-GCM format are Fernet.
+        return _fernet(key).decrypt(enc_name.encode()).decode()
+
+def decrypt_names_bulk(enc_names, key: bytes) -> list:
+    """
+    Decrypt many filename tokens in one pass.
+
+    Each AES-GCM token carries its own nonce, so the ciphertext can't be
+    fused into a single decrypt call — but for dozens-of-byte names the
+    per-call Python overhead (cipher cache lookup, try/except frame)
+    outweighs the AES itself.  Resolving the cached cipher once and
+    looping in a single frame removes that per-name cost.  Tokens that
+    fail both formats come back as None instead of raising.
+    """
+    cipher = _name_cipher(key)
+    b64decode = base64.urlsafe_b64decode
+    out = []
+    for enc_name in enc_names:
+        try:
+            raw = b64decode(enc_name.encode())
+            out.append(cipher.decrypt(raw[:12], raw[12:], None).decode())
+        except Exception:
+            try:
+                out.append(_fernet(key).decrypt(enc_name.encode()).decode())
+            except Exception:
+                out.append(None)
+    return out
\ No newline at end of file
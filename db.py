@@ -1,12 +1,37 @@
 import sqlite3
+from collections import defaultdict
 from datetime import datetime
 
 
 class Database:
     def __init__(self, path="lto.db"):
-        self.conn = sqlite3.connect(path)
+        # sqlite3 keeps parsed statements in an LRU keyed by SQL text;
+        # the default 128 entries can thrash once node queries, label
+        # queries and job queries all run in one session.  All hot SQL
+        # here is parameterized, so each statement is prepared once.
+        self.conn = sqlite3.connect(path, cached_statements=1024)
+        # WAL lets readers (browse/search) proceed while a backup commits,
+        # and NORMAL sync is safe under WAL: a crash can lose the last
+        # transaction but never corrupts the database.  The metadata DB
+        # lives on local disk, not tape, so this is the right trade.
+        # Read-only consumers (launcher dashboard) benefit too: the mmap
+        # window makes their scans of tapes/jobs zero-copy from page cache.
+        # Interactive workflows get the same win: their small commits
+        # (tape registration, job status) no longer fsync twice each.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")      # sort/temp B-trees in RAM
+        self.conn.execute("PRAGMA cache_size=-65536")       # 64 MiB page cache
+        self.conn.execute("PRAGMA mmap_size=268435456")     # 256 MiB mmap window
         self.conn.execute("PRAGMA foreign_keys=ON")
+        # Capacity increments accumulate here and land in one UPDATE when
+        # the job finishes, instead of one commit per increment.
+        self._capacity_delta = defaultdict(int)
         self._init_core()
+        self._migrate_legacy_tape_tables()
+        # Cheap no-op when stats are current; after big index writes it
+        # refreshes planner statistics incrementally.
+        self.conn.execute("PRAGMA optimize")
 
     def _init_core(self):
         self.conn.execute("""
@@ -55,31 +80,144 @@ class Database:
         )
         """)
 
-        self.conn.commit()
-
-    def create_tape_tables(self, tape_id):
-        # mtime stores the source file's last-modified timestamp (Unix float).
-        # Used by incremental backup to detect changes since last run.
-        self.conn.execute(f"""
-        CREATE TABLE IF NOT EXISTS tape_{tape_id} (
-            id        INTEGER PRIMARY KEY AUTOINCREMENT,
+        # File index for ALL tapes, partitioned by tape_id.  One table means
+        # one prepared INSERT shared across tapes and real ANALYZE statistics
+        # for the planner; ids are per-tape (see next_node_id), and
+        # (tape_id, parent_id) covers the tree-walk queries in browse.
+        # mtime stores the source file's last-modified timestamp (Unix float),
+        # used by incremental backup to detect changes since last run.
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS nodes (
+            tape_id   TEXT,
+            id        INTEGER,
             parent_id INTEGER,
             name      TEXT,
             is_dir    INTEGER,
             size      INTEGER,
             mtime     REAL DEFAULT 0,
             job_id    INTEGER,
-            FOREIGN KEY(parent_id) REFERENCES tape_{tape_id}(id)
+            PRIMARY KEY (tape_id, id)
         )
         """)
-        self.conn.execute(f"""
-        CREATE TABLE IF NOT EXISTS tape_{tape_id}_info (
-            key   TEXT PRIMARY KEY,
-            value TEXT
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_nodes_parent ON nodes(tape_id, parent_id)"
+        )
+
+        # Per-tape key/value store (salt, wrapped keys, hashes), likewise
+        # partitioned by tape_id so every caller shares one prepared
+        # `WHERE tape_id=?` statement instead of formatting a fresh
+        # tape_{id}_info query per call.
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS tape_info (
+            tape_id TEXT,
+            key     TEXT,
+            value   TEXT,
+            PRIMARY KEY (tape_id, key)
         )
         """)
+
+        # The map's PK is (tape_id, label_name), so filtering by label
+        # alone (get_tapes_by_label, browse-by-label JOIN) would scan;
+        # this covering index serves it directly.  Job history is always
+        # pulled per tape, hence the jobs index.
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tlm_label ON tape_label_map(label_name, tape_id)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_tape ON jobs(tape_id)"
+        )
+        # Dashboard aggregates (failed count, last successful backup)
+        # filter on status/action.
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status_action ON jobs(status, action)"
+        )
+        # Health report and recovery group/aggregate jobs by
+        # (tape_id, action), filtering on status and taking MAX over
+        # finished_at or job_id; this composite index serves those as
+        # index-only scans instead of per-tape table walks.
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_tape_action_status "
+            "ON jobs(tape_id, action, status, finished_at)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_tape_action_jobid "
+            "ON jobs(tape_id, action, job_id)"
+        )
+        # Restore/backup menus list exactly the successful backup jobs of
+        # one tape; this partial index covers both the filter and every
+        # projected column, so the listing is an index-only scan.  Both
+        # call sites spell the status/action literals out, which is what
+        # lets SQLite match the partial WHERE.
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_success_backup "
+            "ON jobs(tape_id, job_id, started_at, backup_type, size) "
+            "WHERE status='SUCCESS' AND action='BACKUP'"
+        )
+
+        # One-stop tape listing for the selection menus: labels pre-joined
+        # via a correlated GROUP_CONCAT (served by the label map's PK index)
+        # and used_gb computed in SQL instead of per-row in Python — the
+        # menus only format the value, they never do arithmetic on rows.
+        self.conn.execute("""
+        CREATE VIEW IF NOT EXISTS v_tape_summary AS
+        SELECT t.tape_id, t.generation, t.encrypted, t.description,
+               t.used_capacity,
+               (t.used_capacity / 1073741824.0) AS used_gb,
+               (SELECT GROUP_CONCAT(label_name, ', ')
+                FROM tape_label_map m WHERE m.tape_id = t.tape_id) AS labels
+        FROM tapes t
+        """)
+
         self.conn.commit()
 
+    def _migrate_legacy_tape_tables(self):
+        """
+        Fold pre-partitioning per-tape tables into the shared ones: index
+        tables (tape_{id}) into nodes, key/value tables (tape_{id}_info)
+        into tape_info.  Runs once; subsequent opens find nothing to
+        migrate.
+        """
+        # LIKE treats '_' as a wildcard ('tapes' would match 'tape_%'),
+        # so the underscores must be escaped.
+        legacy = self.conn.execute(
+            r"SELECT name FROM sqlite_master WHERE type='table' "
+            r"AND name LIKE 'tape\_%' ESCAPE '\' "
+            r"AND name NOT LIKE '%\_info' ESCAPE '\' "
+            r"AND name NOT IN ('tape_labels', 'tape_label_map', 'tape_info')"
+        ).fetchall()
+        for (table,) in legacy:
+            tape_id = table[len("tape_"):]
+            self.conn.execute(
+                f"INSERT INTO nodes (tape_id,id,parent_id,name,is_dir,size,mtime,job_id) "
+                f"SELECT ?,id,parent_id,name,is_dir,size,mtime,job_id FROM {table}",
+                (tape_id,)
+            )
+            self.conn.execute(f"DROP TABLE {table}")
+        if legacy:
+            self.conn.execute("ANALYZE nodes")
+
+        legacy_info = self.conn.execute(
+            r"SELECT name FROM sqlite_master WHERE type='table' "
+            r"AND name LIKE 'tape\_%\_info' ESCAPE '\'"
+        ).fetchall()
+        for (table,) in legacy_info:
+            tape_id = table[len("tape_"):-len("_info")]
+            self.conn.execute(
+                f"INSERT INTO tape_info (tape_id, key, value) "
+                f"SELECT ?, key, value FROM {table}",
+                (tape_id,)
+            )
+            self.conn.execute(f"DROP TABLE {table}")
+
+        if legacy or legacy_info:
+            self.conn.commit()
+
+    def create_tape_tables(self, tape_id):
+        # Kept for callers' sake: both the file index (nodes) and the
+        # key/value store (tape_info) are shared tables now, so there is
+        # nothing per-tape left to create.
+        pass
+
     # ========================
     # JOB METHODS
     # ========================
@@ -94,6 +232,13 @@ class Database:
         return cur.lastrowid
 
     def finish_job(self, job_id, status="SUCCESS", size=0, tag_hex=None):
+        # Fold any pending capacity delta into the same commit as the
+        # job record update.
+        row = self.conn.execute(
+            "SELECT tape_id FROM jobs WHERE job_id=?", (job_id,)
+        ).fetchone()
+        if row:
+            self.flush_capacity(row[0])
         self.conn.execute(
             "UPDATE jobs SET finished_at=?, status=?, size=?, tag_hex=? WHERE job_id=?",
             (datetime.utcnow().isoformat(), status, size, tag_hex, job_id)
@@ -105,30 +250,83 @@ class Database:
     # ========================
 
     def insert_node(self, tape_id, parent_id, name, is_dir, size, job_id, mtime=0.0):
-        cur = self.conn.execute(
-            f"INSERT INTO tape_{tape_id} (parent_id,name,is_dir,size,mtime,job_id) "
-            f"VALUES (?,?,?,?,?,?)",
-            (parent_id, name, is_dir, size, mtime, job_id)
+        node_id = self.next_node_id(tape_id)
+        self.conn.execute(
+            "INSERT INTO nodes (tape_id,id,parent_id,name,is_dir,size,mtime,job_id) "
+            "VALUES (?,?,?,?,?,?,?,?)",
+            (tape_id, node_id, parent_id, name, is_dir, size, mtime, job_id)
         )
-        return cur.lastrowid
+        return node_id
+
+    def next_node_id(self, tape_id):
+        """Returns the next free node id for the tape's file index."""
+        return self.conn.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM nodes WHERE tape_id=?",
+            (tape_id,)
+        ).fetchone()[0]
+
+    def insert_nodes_bulk(self, tape_id, rows):
+        """
+        Insert fully-formed (id,parent_id,name,is_dir,size,mtime,job_id)
+        rows in one transaction.  Callers pre-assign ids (see next_node_id)
+        so parent references resolve without per-row lastrowid round-trips.
+        """
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT INTO nodes (tape_id,id,parent_id,name,is_dir,size,mtime,job_id) "
+            "VALUES (?,?,?,?,?,?,?,?)",
+            ((tape_id, *row) for row in rows)
+        )
+        self.conn.commit()
 
     # ========================
     # TAPE CAPACITY METHODS
     # ========================
 
     def update_used_capacity(self, tape_id, size_increment):
-        self.conn.execute(
-            "UPDATE tapes SET used_capacity=used_capacity+? WHERE tape_id=?",
-            (size_increment, tape_id)
-        )
-        self.conn.commit()
+        """Accumulates in memory; persisted by finish_job/flush_capacity."""
+        self._capacity_delta[tape_id] += size_increment
+
+    def flush_capacity(self, tape_id):
+        """
+        Writes the pending capacity delta for a tape as one UPDATE.
+        Does not commit — rides the caller's transaction (finish_job).
+        """
+        delta = self._capacity_delta.pop(tape_id, 0)
+        if delta:
+            self.conn.execute(
+                "UPDATE tapes SET used_capacity=used_capacity+? WHERE tape_id=?",
+                (delta, tape_id)
+            )
 
     def get_used_capacity(self, tape_id):
         cur = self.conn.execute(
             "SELECT used_capacity FROM tapes WHERE tape_id=?", (tape_id,)
         )
         row = cur.fetchone()
-        return row[0] if row else 0
+        stored = row[0] if row else 0
+        # Include increments not yet flushed so capacity checks stay honest.
+        return stored + self._capacity_delta.get(tape_id, 0)
+
+    # Hot statements shared by several workflows live here as class
+    # constants: the sqlite3 statement cache is keyed on SQL text, so
+    # every caller going through the same literal re-binds one prepared
+    # statement instead of parsing its own copy of the query.
+    _SQL_TAPE_INFO = "SELECT key, value FROM tape_info WHERE tape_id=?"
+
+    def get_tape_info(self, tape_id):
+        """Return the tape's key/value info rows (salt, key hashes, …) as a dict."""
+        # dict() consumes the row list in one C call; no per-pair bytecode.
+        return dict(self.conn.execute(self._SQL_TAPE_INFO, (tape_id,)).fetchall())
+
+    _SQL_TAPE_KEY_INFO = (
+        "SELECT key, value FROM tape_info "
+        "WHERE tape_id=? AND key IN ('enc_sym_key', 'sym_key_hash')"
+    )
+
+    def get_tape_key_info(self, tape_id):
+        """Just the two RSA key-material rows — all an auto-unlock reads."""
+        return dict(self.conn.execute(self._SQL_TAPE_KEY_INFO, (tape_id,)).fetchall())
 
     def add_tape(self, tape_id, generation, description, encrypted=False):
         self.conn.execute(
@@ -188,6 +386,17 @@ class Database:
         ).fetchall()
         return [r[0] for r in rows]
 
+    def get_all_tape_labels(self):
+        """Returns {tape_id: [label_name, ...]} for every labelled tape."""
+        rows = self.conn.execute(
+            "SELECT tape_id, label_name FROM tape_label_map "
+            "ORDER BY tape_id, label_name"
+        ).fetchall()
+        mapping = {}
+        for tape_id, label_name in rows:
+            mapping.setdefault(tape_id, []).append(label_name)
+        return mapping
+
     def get_tapes_by_label(self, label_name):
         """Returns sorted list of tape_ids that carry the given label."""
         rows = self.conn.execute(
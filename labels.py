@@ -104,8 +104,10 @@ def _assign_label(db):
         wait_for_keypress()
         return
 
+    # One query for all assignments instead of one per tape.
+    label_map = db.get_all_tape_labels()
     for i, (tid, desc) in enumerate(tapes, 1):
-        existing = db.get_labels_for_tape(tid)
+        existing = label_map.get(tid, [])
         tag_str  = f"  [dim][{', '.join(existing)}][/]" if existing else ""
         console.print(f"  {i}. [cyan]{tid}[/] — {desc or '—'}{tag_str}")
 
@@ -154,10 +156,11 @@ def _remove_label(db):
         return
 
     # Only show tapes that actually have labels
+    label_map = db.get_all_tape_labels()
     tapes_with_labels = [
-        (tid, desc, db.get_labels_for_tape(tid))
+        (tid, desc, label_map[tid])
         for tid, desc in tapes
-        if db.get_labels_for_tape(tid)
+        if tid in label_map
     ]
     if not tapes_with_labels:
         console.print("[dim]No tape has any labels assigned.[/]")
@@ -212,8 +215,14 @@ def _browse_by_label(db):
         return
     label_name = labels[idx][0]
 
-    tape_ids = db.get_tapes_by_label(label_name)
-    if not tape_ids:
+    # Single JOIN instead of get_tapes_by_label plus one SELECT per tape.
+    rows = db.conn.execute(
+        "SELECT t.tape_id, t.generation, t.encrypted, t.used_capacity, t.description "
+        "FROM tapes t JOIN tape_label_map m ON t.tape_id = m.tape_id "
+        "WHERE m.label_name=? ORDER BY t.tape_id",
+        (label_name,)
+    ).fetchall()
+    if not rows:
         console.print(f"[yellow]No tapes assigned to '{label_name}'.[/]")
         wait_for_keypress()
         return
@@ -227,15 +236,9 @@ def _browse_by_label(db):
     table.add_column("Used",        justify="right")
     table.add_column("Description")
 
-    for tid in tape_ids:
-        row = db.conn.execute(
-            "SELECT generation, encrypted, used_capacity, description "
-            "FROM tapes WHERE tape_id=?", (tid,)
-        ).fetchone()
-        if row:
-            gen, enc, used, desc = row
-            status = "[red]Encrypted[/]" if enc else "[green]Plain[/]"
-            table.add_row(tid, gen, status, f"{used / 1024**3:.2f} GB", desc or "")
+    for tid, gen, enc, used, desc in rows:
+        status = "[red]Encrypted[/]" if enc else "[green]Plain[/]"
+        table.add_row(tid, gen, status, f"{used / 1024**3:.2f} GB", desc or "")
 
     console.print(table)
     wait_for_keypress()
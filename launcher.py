@@ -9,23 +9,12 @@ import os
 import sys
 import time
 import shutil
+import signal
 import subprocess
 
-from db import Database
-from config_manager import cfg
-from ui import console
-from rich.table import Table
-from rich.columns import Columns
-from rich.panel import Panel
-from rich.text import Text
-from datetime import datetime, timezone
-
-# Optional pyfiglet
-try:
-    import pyfiglet
-    HAS_FIGLET = True
-except ImportError:
-    HAS_FIGLET = False
+# Heavy imports (rich, pyfiglet, db and friends) are deferred into the
+# functions that use them: the launcher's first paint is the banner, and
+# nothing should load font files or the rich machinery before it shows.
 
 # ANSI colors
 BLUE = "\033[1;34m"
@@ -38,19 +27,64 @@ RAINBOW = [
     "\033[1;35m",  # magenta
 ]
 
+# Terminal width is cached: get_terminal_size() is a TIOCGWINSZ ioctl and
+# the centered effects would otherwise issue it once per printed line.
+# A SIGWINCH handler invalidates the cache when the window is resized.
+_cached_width = None
+_winch_installed = False
+
+def _invalidate_width(*_):
+    global _cached_width
+    _cached_width = None
+
 def term_width(default=80):
+    global _cached_width, _winch_installed
+    if _cached_width is not None:
+        return _cached_width
+    if not _winch_installed and hasattr(signal, "SIGWINCH"):
+        try:
+            signal.signal(signal.SIGWINCH, _invalidate_width)
+            _winch_installed = True
+        except ValueError:
+            # Not on the main thread; fall back to caching without
+            # resize invalidation.
+            _winch_installed = True
     try:
-        return shutil.get_terminal_size().columns
+        _cached_width = shutil.get_terminal_size().columns
     except Exception:
-        return default
+        _cached_width = default
+    return _cached_width
 
 # -------- effects --------
 
+# When stdout is piped (log capture, CI) the animation delays are dead
+# time and the ANSI codes are litter; everything falls back to plain
+# single-write prints.
+_ISATTY = sys.stdout.isatty()
+
+def _type_out(styled, delay):
+    """
+    Emit pre-styled character strings one write() at a time.
+    With delay <= 0 the whole line goes out in a single write — the
+    per-character path only exists for the animation effect.
+    """
+    if delay <= 0:
+        sys.stdout.write("".join(styled) + "\n")
+        sys.stdout.flush()
+        return
+    write, flush, sleep = sys.stdout.write, sys.stdout.flush, time.sleep
+    for s in styled:
+        write(s)
+        flush()
+        sleep(delay)
+    write("\n")
+    flush()
+
 def typewriter(text, delay=0.002):
-    for ch in text:
-        print(ch, end="", flush=True)
-        time.sleep(delay)
-    print()
+    if not _ISATTY:
+        print(text)
+        return
+    _type_out(text, delay)
 
 def typewriter_centered(text, delay=0.002):
     w = term_width()
@@ -60,50 +94,57 @@ def typewriter_centered(text, delay=0.002):
 def typewriter_blue_centered(text, delay=0.002):
     w = term_width()
     pad = max((w - len(text)) // 2, 0)
-    for ch in " " * pad + text:
-        print(f"{BLUE}{ch}{RESET}", end="", flush=True)
-        time.sleep(delay)
-    print()
+    if not _ISATTY:
+        print(" " * pad + text)
+        return
+    padded = " " * pad + text
+    # Below ~50 ms of total animation the effect is invisible anyway
+    # (sleep granularity eats it), so the figlet banner lines go out as
+    # one write each instead of one per character.
+    if delay * len(padded) < 0.05:
+        sys.stdout.write(BLUE + padded + RESET + "\n")
+        sys.stdout.flush()
+        return
+    _type_out([BLUE + ch + RESET for ch in padded], delay)
 
 def typewriter_rainbow_centered(text, delay=0.01):
     w = term_width()
     pad = max((w - len(text)) // 2, 0)
+    if not _ISATTY:
+        print(" " * pad + text)
+        return
+    styled = []
     i = 0
     for ch in " " * pad + text:
         if ch.isspace():
-            print(ch, end="", flush=True)
+            styled.append(ch)
         else:
-            print(f"{RAINBOW[i % len(RAINBOW)]}{ch}{RESET}", end="", flush=True)
+            styled.append(RAINBOW[i % len(RAINBOW)] + ch + RESET)
             i += 1
-        time.sleep(delay)
-    print()
+    _type_out(styled, delay)
 
 def loading_bar(duration=1.2, width=30):
+    # Fixed frame count paced against a monotonic deadline: each sleep
+    # targets start + i*0.02, so scheduler jitter doesn't accumulate and
+    # wall-clock adjustments can't stretch the bar.
+    frames = max(1, int(duration / 0.02))
+    pad = " " * ((term_width() - (width + 10)) // 2)
     print()
-    print(" " * ((term_width() - (width + 10)) // 2) + "Loading ", end="", flush=True)
-    start = time.time()
-    while True:
-        elapsed = time.time() - start
-        progress = min(elapsed / duration, 1.0)
-        filled = int(width * progress)
-        bar = "[" + "=" * filled + " " * (width - filled) + "]"
-        print("\r" + " " * ((term_width() - (width + 10)) // 2) + "Loading " + bar,
-              end="", flush=True)
-        if progress >= 1:
-            break
-        time.sleep(0.02)
+    start = time.monotonic()
+    for i in range(frames + 1):
+        filled = width * i // frames
+        sys.stdout.write("\r" + pad + "Loading [" + "=" * filled + " " * (width - filled) + "]")
+        sys.stdout.flush()
+        target = start + (i + 1) * 0.02
+        remaining = target - time.monotonic()
+        if remaining > 0 and i < frames:
+            time.sleep(remaining)
     print("\n")
 
-def tape_drive_animation(cycles=2, delay=0.12):
-    """
-    High-quality ASCII LTO tape drive startup animation
-    Clean, symmetric, industrial blue style
-    """
-
-    BLUE = "\033[1;34m"
-    RESET = "\033[0m"
-
-    frames = [
+# Animation frames are styled once at import: cursor-home+clear, colour
+# and reset are folded into each string so the play loop only indexes.
+_TAPE_CLEAR = "\x1b[H\x1b[2J"
+_tape_frames_raw = [
 r"""
         ╔══════════════════════════╗
         ║       LTO TAPE DRIVE     ║
@@ -204,12 +245,31 @@ r"""
         ╚══════════════════════════╝
 """
     ]
+_TAPE_FRAMES = tuple(_TAPE_CLEAR + BLUE + f + RESET + "\n" for f in _tape_frames_raw)
 
+def tape_drive_animation(cycles=2, delay=0.12):
+    """
+    High-quality ASCII LTO tape drive startup animation
+    Clean, symmetric, industrial blue style
+    """
+    # LTO_FAST=1 skips the ~2 s animation for scripted/repeat launches;
+    # LTO_ANIM_CYCLES overrides the cycle count without code changes.
+    if not _ISATTY or os.environ.get("LTO_FAST"):
+        return
+    try:
+        cycles = int(os.environ.get("LTO_ANIM_CYCLES", cycles))
+    except ValueError:
+        pass
+    if os.name == "nt":
+        # Kicks the console into VT mode so the ANSI clear works.
+        os.system("")
+
+    write, flush, sleep = sys.stdout.write, sys.stdout.flush, time.sleep
     for _ in range(cycles):
-        for frame in frames:
-            os.system("cls" if os.name == "nt" else "clear")
-            print(BLUE + frame + RESET)
-            time.sleep(delay)
+        for frame in _TAPE_FRAMES:
+            write(frame)
+            flush()
+            sleep(delay)
 
 # -------- input --------
 
@@ -220,12 +280,16 @@ def wait_any_key():
             import msvcrt
             msvcrt.getch()
         else:
-            import tty, termios
+            import termios
             fd = sys.stdin.fileno()
             old = termios.tcgetattr(fd)
+            # Only drop canonical mode and echo (cbreak); full raw mode
+            # disables signal keys too and costs an extra mode change.
+            new = termios.tcgetattr(fd)
+            new[3] &= ~(termios.ICANON | termios.ECHO)
             try:
-                tty.setraw(fd)
-                sys.stdin.read(1)
+                termios.tcsetattr(fd, termios.TCSANOW, new)
+                os.read(fd, 1)
             finally:
                 termios.tcsetattr(fd, termios.TCSADRAIN, old)
     except Exception:
@@ -233,18 +297,46 @@ def wait_any_key():
 
 # -------- main logic --------
 
-def run_main():
-    if not os.path.exists("main.py"):
-        print("ERROR: main.py not found")
+# Frozen/packaged builds ship main.exe next to the launcher; source
+# checkouts run main.py.  Resolving once here keeps a single launcher
+# serving both distributions instead of two diverging copies.
+def _main_target():
+    if getattr(sys, "frozen", False) or os.path.exists("main.exe"):
+        return "main.exe"
+    return "main.py"
+
+def run_main(target=None):
+    target = target or _main_target()
+    if not os.path.exists(target):
+        print(f"ERROR: {target} not found")
         sys.exit(1)
-    subprocess.call([sys.executable, "main.py"])
+    if target.endswith(".py"):
+        subprocess.call([sys.executable, target])
+    else:
+        subprocess.call([os.path.abspath(target)])
+
+# Rendered figlet blocks, cached after the first print_banner call so a
+# session never parses the font file twice (None = not yet tried).
+_banner_blocks = None
+
+def _figlet_blocks():
+    global _banner_blocks
+    if _banner_blocks is None:
+        try:
+            import pyfiglet
+            _banner_blocks = (
+                pyfiglet.figlet_format("LTO Backup &", font="standard"),
+                pyfiglet.figlet_format("Manage System", font="standard"),
+            )
+        except ImportError:
+            _banner_blocks = ()
+    return _banner_blocks
 
 def print_banner():
     print("\n")
-    if HAS_FIGLET:
-        fig1 = pyfiglet.figlet_format("LTO Backup &", font="standard")
-        fig2 = pyfiglet.figlet_format("Manage System", font="standard")
-        for block in (fig1, fig2):
+    blocks = _figlet_blocks()
+    if blocks:
+        for block in blocks:
             for line in block.splitlines():
                 typewriter_blue_centered(line, delay=0.0008)
     else:
@@ -256,6 +348,9 @@ def print_banner():
 
 def _make_stat_card(icon, value, label, value_style="bold cyan"):
     """Build a single Rich Panel stat card for the dashboard."""
+    from rich.panel import Panel
+    from rich.text import Text
+
     content = Text(justify="center")
     content.append(f"{icon}\n", style="")
     content.append(f"{value}\n", style=value_style)
@@ -265,22 +360,24 @@ def _make_stat_card(icon, value, label, value_style="bold cyan"):
 
 def print_dashboard(db):
     """Render a one-screen summary dashboard using Rich panels and a table."""
+    from datetime import datetime
 
-    # ---- Global stats --------------------------------------------------------
-    tape_count = db.conn.execute("SELECT COUNT(*) FROM tapes").fetchone()[0]
-
-    total_used = db.conn.execute(
-        "SELECT SUM(used_capacity) FROM tapes"
-    ).fetchone()[0] or 0
+    from rich.columns import Columns
+    from rich.table import Table
 
-    failed_jobs = db.conn.execute(
-        "SELECT COUNT(*) FROM jobs WHERE status='FAILED'"
-    ).fetchone()[0]
+    from config_manager import cfg
+    from ui import console
 
-    last_bk_row = db.conn.execute(
-        "SELECT MAX(finished_at) FROM jobs WHERE status='SUCCESS' AND action='BACKUP'"
-    ).fetchone()
-    last_backup_ts = last_bk_row[0] if last_bk_row else None
+    # ---- Global stats --------------------------------------------------------
+    # All four aggregates in one round-trip instead of four
+    # prepare/execute/fetch cycles.
+    tape_count, total_used, failed_jobs, last_backup_ts = db.conn.execute("""
+        SELECT (SELECT COUNT(*) FROM tapes),
+               (SELECT COALESCE(SUM(used_capacity), 0) FROM tapes),
+               (SELECT COUNT(*) FROM jobs WHERE status='FAILED'),
+               (SELECT MAX(finished_at) FROM jobs
+                WHERE status='SUCCESS' AND action='BACKUP')
+    """).fetchone()
 
     if last_backup_ts:
         try:
@@ -307,15 +404,45 @@ def print_dashboard(db):
     console.print(Columns(cards, equal=True, expand=True))
 
     # ---- Per-tape breakdown table -------------------------------------------
+    # Capacities from config go into a temp table so SQLite computes the
+    # usage figures in C; the Python loop below only formats.
+    gens = cfg.get("generations", {}) or {}
+    db.conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS _gen_cap (gen TEXT PRIMARY KEY, cap INTEGER)"
+    )
+    db.conn.executemany(
+        "INSERT OR REPLACE INTO _gen_cap (gen, cap) VALUES (?, ?)",
+        [(g, info.get("capacity", 1)) for g, info in gens.items()]
+    )
     tape_rows = db.conn.execute(
-        "SELECT tape_id, generation, encrypted, description, used_capacity "
-        "FROM tapes ORDER BY tape_id"
+        "SELECT t.tape_id, t.generation, t.encrypted, t.description, "
+        "       t.used_capacity / 1073741824.0 AS gb, "
+        "       COALESCE(t.used_capacity * 100.0 / NULLIF("
+        "           COALESCE(g.cap, (SELECT cap FROM _gen_cap WHERE gen='L5')), 0), 0) AS pct "
+        "FROM tapes t LEFT JOIN _gen_cap g ON g.gen = t.generation "
+        "ORDER BY t.tape_id"
     ).fetchall()
 
     if not tape_rows:
         console.print("[dim]No tapes registered yet.[/]")
         return
 
+    # Rich's renderer walks markup per cell; past a couple hundred tapes
+    # that is seconds of formatting for a table nobody reads row by row.
+    # Large libraries get a plain fixed-width dump in one write instead.
+    if len(tape_rows) > 200:
+        lines = [
+            f"{'Tape ID':<12} {'Gen':<4} {'Enc':<3} {'Used':>10} {'Usage %':>8}  Description"
+        ]
+        for tid, gen, enc, desc, gb, pct in tape_rows:
+            lines.append(
+                f"{tid:<12} {gen or '':<4} {'Y' if enc else 'N':<3} "
+                f"{gb:>8.2f}GB {pct:>7.1f}%  {desc or ''}"
+            )
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        return
+
     table = Table(show_header=True, header_style="bold magenta", box=None)
     table.add_column("Tape ID",     style="cyan",  no_wrap=True)
     table.add_column("Gen",         no_wrap=True)
@@ -324,11 +451,7 @@ def print_dashboard(db):
     table.add_column("Usage %",     justify="right", no_wrap=True)
     table.add_column("Description")
 
-    for tid, gen, enc, desc, used in tape_rows:
-        gen_info = cfg.get_generation_info(gen)
-        max_cap  = gen_info.get("capacity", 1)
-        pct      = used / max_cap * 100 if max_cap > 0 else 0
-
+    for tid, gen, enc, desc, gb, pct in tape_rows:
         # Colour the usage percentage based on thresholds
         if pct > 95:
             pct_str = f"[red]{pct:.1f}%[/]"
@@ -338,7 +461,7 @@ def print_dashboard(db):
             pct_str = f"[green]{pct:.1f}%[/]"
 
         enc_str  = "[red]🔒[/]" if enc else "[green]🔓[/]"
-        used_str = f"{used / 1024**3:.2f} GB"
+        used_str = f"{gb:.2f} GB"
 
         table.add_row(tid, gen, enc_str, used_str, pct_str, desc or "")
 
@@ -349,6 +472,7 @@ def main():
     print_banner()
     # loading_bar()
 
+    from db import Database
     db = Database()
     print_dashboard(db)
 
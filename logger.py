@@ -1,22 +1,52 @@
 import logging
 import json
+import atexit
 import csv
 import os
-from datetime import datetime, timezone
-from logging.handlers import RotatingFileHandler
+import re
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import Queue
+
+# One encode per record and one decode per exported line; orjson is several
+# times faster than stdlib json on small dicts.  Both raise ValueError
+# subclasses on bad input, so error handling below stays shared.
+try:
+    import orjson
+    def _dumps(entry): return orjson.dumps(entry).decode()
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(entry): return json.dumps(entry, ensure_ascii=False)
+    _loads = json.loads
+
+
+# Log lines written before the JSON formatter: "[timestamp] [LEVEL] message".
+# One compiled-regex match per line beats the old split-twice parsing.
+_LEGACY_LINE_RE = re.compile(r"^\[([^\]]+)\] \[([^\]]+)\] (.*)$")
 
 
 class _JsonFormatter(logging.Formatter):
     """Formats each log record as a single-line JSON object for reliable parsing."""
+
+    # The rendered timestamp only has second resolution, so bursts of
+    # records within the same second reuse the previous string instead of
+    # re-running gmtime/strftime each time.
+    _last_sec = None
+    _last_str = ""
+
     def format(self, record):
+        sec = int(record.created)
+        if sec != _JsonFormatter._last_sec:
+            _JsonFormatter._last_sec = sec
+            _JsonFormatter._last_str = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.gmtime(sec)
+            )
         entry = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
+            "timestamp": _JsonFormatter._last_str,
             "level": record.levelname,
             "message": record.getMessage(),
         }
-        return json.dumps(entry, ensure_ascii=False)
+        return _dumps(entry)
 
 
 class Logger:
@@ -41,18 +71,36 @@ class Logger:
                 encoding="utf-8",
             )
             handler.setFormatter(_JsonFormatter())
-            self._logger.addHandler(handler)
+            # Callers only pay for an in-memory enqueue; a listener thread
+            # does the formatting and file write, so a slow disk can't
+            # stall the backup loop on every log line.
+            log_queue = Queue(-1)
+            self._listener = QueueListener(
+                log_queue, handler, respect_handler_level=True
+            )
+            self._listener.start()
+            atexit.register(self._stop_listener)
+            self._logger.addHandler(QueueHandler(log_queue))
 
-    def log(self, message, level="INFO"):
-        """Appends a structured JSON log entry at the given level."""
-        dispatch = {
+        # Built once: log() used to rebuild this dict of bound methods on
+        # every call, which adds up on chatty backup jobs.
+        self._dispatch = {
             "DEBUG":    self._logger.debug,
             "INFO":     self._logger.info,
             "WARNING":  self._logger.warning,
             "ERROR":    self._logger.error,
             "CRITICAL": self._logger.critical,
         }
-        dispatch.get(level.upper(), self._logger.info)(message)
+
+    def _stop_listener(self):
+        # Idempotent: QueueListener.stop crashes if called twice.
+        listener = getattr(self, "_listener", None)
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+
+    def log(self, message, level="INFO"):
+        """Appends a structured JSON log entry at the given level."""
+        self._dispatch.get(level.upper(), self._logger.info)(message)
 
     def export_csv(self, output_path="operations_export.csv"):
         """
@@ -63,26 +111,35 @@ class Logger:
             print("No log file found to export.")
             return
 
-        rows = []
-        with open(self.log_file, "r", encoding="utf-8") as f:
-            for line in f:
+        # Stream straight from log line to CSV row: rotated log sets can be
+        # tens of MB, and buffering every parsed row in a list doubles the
+        # peak footprint for no benefit.
+        count = 0
+        with open(self.log_file, "r", encoding="utf-8") as src, \
+             open(output_path, "w", newline="", encoding="utf-8") as dst:
+            writer = csv.writer(dst)
+            writer.writerow(["Timestamp", "Level", "Message"])
+            for line in src:
                 line = line.strip()
                 if not line:
                     continue
                 try:
-                    entry = json.loads(line)
-                    rows.append([
-                        entry.get("timestamp", ""),
-                        entry.get("level", ""),
-                        entry.get("message", ""),
-                    ])
-                except json.JSONDecodeError:
-                    # Skip lines that are not valid JSON (e.g., rotation boundary markers)
+                    entry = _loads(line)
+                except ValueError:
+                    # Not JSON: maybe a line from the pre-JSON bracket
+                    # format; anything else is skipped (e.g., rotation
+                    # boundary markers).
+                    m = _LEGACY_LINE_RE.match(line)
+                    if not m:
+                        continue
+                    writer.writerow(m.groups())
+                    count += 1
                     continue
+                writer.writerow((
+                    entry.get("timestamp", ""),
+                    entry.get("level", ""),
+                    entry.get("message", ""),
+                ))
+                count += 1
 
-        with open(output_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Timestamp", "Level", "Message"])
-            writer.writerows(rows)
-
-        print(f"Exported {len(rows)} log entries to {output_path}")
+        print(f"Exported {count} log entries to {output_path}")
@@ -1,28 +1,21 @@
+import hmac
 import time
 import os
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 
 from ui import (
     header, confirm, console, wait_for_keypress,
     clear, print_error, print_success, choose_arrow,
 )
 from db import Database
-from backup import run_backup_job
-from restore import run_restore_job
-from browse import browse
 from logger import Logger
 from config_manager import cfg
-from scanner import scan_barcode_from_camera
-from rich.table import Table
-from verify import verify_tape_integrity
-from recovery import recover_database_from_tape
-from crypto import (
-    derive_key, generate_rsa_keypair,
-    encrypt_symmetric_key, decrypt_symmetric_key, sha256_hex,
-)
-from labels import manage_labels_workflow
-from search import search_workflow
-from report import health_report_workflow
+
+# Everything heavier is imported at first use inside the function that
+# needs it: scanner drags in OpenCV (~half a second), the workflow
+# modules pull in cryptography/tqdm, and none of that should tax a user
+# who opened the menu to export logs.  Same policy as the launcher.
 
 db  = Database()
 log = Logger()
@@ -38,6 +31,7 @@ def get_tape_id_input(prompt="Enter Tape ID"):
     console.print("[dim]Type ID directly or 'scan' to use camera.[/]")
     val = input("> ").strip()
     if val.lower() == "scan":
+        from scanner import scan_barcode_from_camera
         code = scan_barcode_from_camera()
         if code:
             console.print(f"Scanned: [bold green]{code}[/]")
@@ -47,6 +41,19 @@ def get_tape_id_input(prompt="Enter Tape ID"):
     return val if val else None
 
 
+_TAPE_SUMMARY_SQL = """
+    SELECT tape_id, generation, encrypted, description, used_gb, labels
+    FROM v_tape_summary
+    ORDER BY tape_id
+"""
+_TAPE_SUMMARY_BY_LABEL_SQL = """
+    SELECT tape_id, generation, encrypted, description, used_gb, labels
+    FROM v_tape_summary
+    WHERE tape_id IN (SELECT tape_id FROM tape_label_map WHERE label_name=?)
+    ORDER BY tape_id
+"""
+
+
 def select_tape_interactive(filter_label=None):
     """
     Show a tape selection table and return (tape_id, generation, is_encrypted).
@@ -54,29 +61,20 @@ def select_tape_interactive(filter_label=None):
     """
     header("Select Tape" + (f" — Label: {filter_label}" if filter_label else ""))
 
-    # Join with label map so we can show labels in the table and optionally filter
-    query = """
-        SELECT t.tape_id, t.generation, t.encrypted, t.description, t.used_capacity,
-               GROUP_CONCAT(m.label_name, ', ') AS labels
-        FROM tapes t
-        LEFT JOIN tape_label_map m ON t.tape_id = m.tape_id
-        {where}
-        GROUP BY t.tape_id
-        ORDER BY t.tape_id
-    """
+    # v_tape_summary pre-joins labels and computes used_gb in SQL.  Both
+    # variants are fixed module-level strings so the statement cache sees
+    # the same text on every menu display.
     if filter_label:
-        tapes = db.conn.execute(
-            query.format(where="WHERE t.tape_id IN "
-                               "(SELECT tape_id FROM tape_label_map WHERE label_name=?)"),
-            (filter_label,)
-        ).fetchall()
+        tapes = db.conn.execute(_TAPE_SUMMARY_BY_LABEL_SQL, (filter_label,)).fetchall()
     else:
-        tapes = db.conn.execute(query.format(where="")).fetchall()
+        tapes = db.conn.execute(_TAPE_SUMMARY_SQL).fetchall()
 
     if not tapes:
         console.print("[red]No tapes found.[/]")
         return None, None, None
 
+    from rich.table import Table
+
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("#",           style="dim")
     table.add_column("ID",          style="cyan")
@@ -86,12 +84,12 @@ def select_tape_interactive(filter_label=None):
     table.add_column("Labels")
     table.add_column("Description")
 
-    for i, (tid, gen, enc, desc, used, labels_str) in enumerate(tapes, start=1):
+    for i, (tid, gen, enc, desc, used_gb, labels_str) in enumerate(tapes, start=1):
         status     = "[red]Locked[/]" if enc else "[green]Plain[/]"
         labels_disp = labels_str or "—"
         table.add_row(
             str(i), tid, gen, status,
-            f"{used / 1024**3:.2f} GB",
+            f"{used_gb:.2f} GB",
             labels_disp,
             desc or "",
         )
@@ -101,6 +99,7 @@ def select_tape_interactive(filter_label=None):
     choice = input("> ").strip()
 
     if choice.lower() == "scan":
+        from scanner import scan_barcode_from_camera
         scanned_id = scan_barcode_from_camera()
         if scanned_id:
             for t in tapes:
@@ -119,26 +118,79 @@ def select_tape_interactive(filter_label=None):
         t = tapes[idx]
         header(f"Selected: {t[0]}")
         console.print(f"Description: {t[3]}")
-        console.print(f"Used: {t[4] / 1024**3:.2f} GB")
+        console.print(f"Used: {t[4]:.2f} GB")
         if confirm("Confirm selection?"):
             return t[0], t[1], t[2]
 
     return None, None, None
 
 
+# Per-session caches: the info rows never change outside add_new_tapes
+# (which invalidates below), and a key that already passed its hash check
+# doesn't need to be re-derived this session — that skips the KDF on the
+# passphrase path and the private.pem read + RSA-OAEP decrypt on the RSA
+# path.  Keys stay in process memory only; nothing touches the OS keyring.
+_tape_info_cache = {}
+_session_keys = {}
+
+
+def _load_tape_info(tape_id):
+    info = _tape_info_cache.get(tape_id)
+    if info is None:
+        info = _tape_info_cache[tape_id] = db.get_tape_info(tape_id)
+    return info
+
+
+# Key material is stored as raw BLOBs since the hex/BLOB switch; rows
+# written before that are hex TEXT, so reads accept both.
+
+def _info_bytes(value):
+    return value if isinstance(value, bytes) else bytes.fromhex(value)
+
+
+def _key_matches(key, stored_hash):
+    from crypto import sha256_bytes, sha256_hex
+
+    # compare_digest: no early exit, so the comparison can't leak how much
+    # of the digest matched (and it's a single C memcmp-style loop).
+    if isinstance(stored_hash, bytes):
+        return hmac.compare_digest(sha256_bytes(key), stored_hash)
+    return hmac.compare_digest(sha256_hex(key), stored_hash)
+
+
+# Key files don't appear or vanish mid-session; remember the probe for a
+# few seconds so repeated unlock prompts don't re-stat the default path.
+_pem_exists_cache = {}
+
+
+def _pem_exists(path, ttl=5.0):
+    now = time.monotonic()
+    hit = _pem_exists_cache.get(path)
+    if hit is not None and now - hit[0] < ttl:
+        return hit[1]
+    exists = os.path.exists(path)
+    _pem_exists_cache[path] = (now, exists)
+    return exists
+
+
 def unlock_tape(tape_id):
     """
     Prompt the user to authenticate and retrieve the AES symmetric key for a
     tape.  Returns the key bytes on success, or None on failure/cancel.
+    Unlocking is remembered for the rest of the session.
     """
-    rows = db.conn.execute(
-        f"SELECT key, value FROM tape_{tape_id}_info"
-    ).fetchall()
-    info = {k: v for k, v in rows}
+    from crypto import derive_key, derive_key_scrypt, decrypt_symmetric_key
+
+    info = _load_tape_info(tape_id)
 
     if "sym_key_hash" not in info:
         return None  # Tape has no encryption configured
 
+    cached = _session_keys.get(tape_id)
+    if cached is not None and _key_matches(cached, info["sym_key_hash"]):
+        console.print(f"[green]Tape {tape_id} already unlocked this session.[/]")
+        return cached
+
     console.print(f"\n[bold red]LOCKED TAPE: {tape_id}[/]")
     print("1. Unlock with Passphrase")
     print("2. Unlock with RSA Private Key")
@@ -153,15 +205,22 @@ def unlock_tape(tape_id):
                 console.print("[red]This tape was not configured with a password.[/]")
                 return None
             pwd  = input("Passphrase: ").encode()
-            salt = bytes.fromhex(info["kdf_salt"])
-            key  = derive_key(pwd, salt)
+            salt = _info_bytes(info["kdf_salt"])
+            # Tapes configured since the scrypt switch record their KDF and
+            # cost in kdf_params; older tapes have no row and stay on PBKDF2.
+            params = info.get("kdf_params", "")
+            if params.startswith("scrypt:"):
+                _, n, r, p = params.split(":")
+                key = derive_key_scrypt(pwd, salt, int(n), int(r), int(p))
+            else:
+                key = derive_key(pwd, salt)
 
         elif choice == "2":
             if "enc_sym_key" not in info:
                 console.print("[red]This tape was not configured with RSA.[/]")
                 return None
             default_path = f"keys/{tape_id}/private.pem"
-            prompt_path  = default_path if os.path.exists(default_path) else ""
+            prompt_path  = default_path if _pem_exists(default_path) else ""
             path = input(f"Path to private.pem [{prompt_path}]: ").strip()
             if not path and prompt_path:
                 path = prompt_path
@@ -170,16 +229,17 @@ def unlock_tape(tape_id):
                 return None
             with open(path, "rb") as f:
                 priv_pem = f.read()
-            enc_key = bytes.fromhex(info["enc_sym_key"])
+            enc_key = _info_bytes(info["enc_sym_key"])
             key     = decrypt_symmetric_key(enc_key, priv_pem)
         else:
             return None
 
-        if sha256_hex(key) != stored_hash:
+        if not _key_matches(key, stored_hash):
             console.print("[red]Decryption failed: invalid key/passphrase.[/]")
             return None
 
         console.print("[green]Tape unlocked.[/]")
+        _session_keys[tape_id] = key
         return key
 
     except Exception as e:
@@ -191,7 +251,18 @@ def unlock_tape(tape_id):
 # TAPE MANAGEMENT
 # =============================================================================
 
+# Single worker for speculative RSA keygen in add_new_tapes; one key pair
+# is ever in flight at a time.
+_keygen_pool = ThreadPoolExecutor(max_workers=1)
+
+
 def add_new_tapes():
+    from crypto import (
+        derive_key_scrypt, calibrate_scrypt, SCRYPT_R, SCRYPT_P,
+        generate_rsa_keypair_pems, save_rsa_keypair,
+        encrypt_symmetric_key, sha256_bytes,
+    )
+
     header("Add New Tapes")
 
     while True:
@@ -213,6 +284,14 @@ def add_new_tapes():
             continue
 
         is_enc = confirm(f"Enable encryption for {tape_id}?")
+
+        # Speculatively generate an RSA key pair while the user reads the
+        # method menu: keygen takes a noticeable beat, and the pure-PEM
+        # variant has no side effects, so a discarded result costs nothing.
+        rsa_future = None
+        if is_enc:
+            rsa_future = _keygen_pool.submit(generate_rsa_keypair_pems)
+
         db.add_tape(tape_id, gen, description, is_enc)
 
         if is_enc:
@@ -221,42 +300,43 @@ def add_new_tapes():
             print("2. RSA Key Pair (saves key files to disk)")
             choice = input("Select method (1/2): ").strip()
 
-            final_key = None
+            # All info rows for a tape are collected here and written in one
+            # executemany transaction: one statement prepare, one commit, and
+            # a tape never ends up with half its key material on disk.
+            info_rows = []
 
             if choice == "1":
                 pwd = input("Set Passphrase: ").strip().encode()
                 if not pwd:
                     console.print("[red]Password cannot be empty. Tape set to plain.[/]")
-                    db.conn.execute(
-                        "UPDATE tapes SET encrypted=0 WHERE tape_id=?", (tape_id,)
-                    )
+                    with db.conn:
+                        db.conn.execute(
+                            "UPDATE tapes SET encrypted=0 WHERE tape_id=?", (tape_id,)
+                        )
                     continue
-                salt      = os.urandom(16)
-                final_key = derive_key(pwd, salt)
-                db.conn.execute(
-                    f"INSERT INTO tape_{tape_id}_info (key, value) VALUES (?, ?)",
-                    ("kdf_salt", salt.hex())
-                )
-                db.conn.execute(
-                    f"INSERT INTO tape_{tape_id}_info (key, value) VALUES (?, ?)",
-                    ("sym_key_hash", sha256_hex(final_key))
-                )
+                salt = os.urandom(16)
+                # Calibrate once per configuration so slow hosts aren't stuck
+                # behind a cost chosen on fast ones; params travel with the tape.
+                n = calibrate_scrypt()
+                final_key = derive_key_scrypt(pwd, salt, n, SCRYPT_R, SCRYPT_P)
+                info_rows = [
+                    ("kdf_salt", salt),
+                    ("kdf_params", f"scrypt:{n}:{SCRYPT_R}:{SCRYPT_P}"),
+                    ("sym_key_hash", sha256_bytes(final_key)),
+                ]
                 console.print("[green]Key derived from password and configured.[/]")
 
             elif choice == "2":
                 final_key = secrets.token_bytes(32)
                 key_dir   = f"keys/{tape_id}"
                 console.print(f"Generating RSA keys in {key_dir}…")
-                public_pem  = generate_rsa_keypair(key_dir)
+                private_pem, public_pem = rsa_future.result()
+                save_rsa_keypair(key_dir, private_pem, public_pem)
                 enc_sym_key = encrypt_symmetric_key(final_key, public_pem)
-                db.conn.execute(
-                    f"INSERT INTO tape_{tape_id}_info (key, value) VALUES (?, ?)",
-                    ("enc_sym_key", enc_sym_key.hex())
-                )
-                db.conn.execute(
-                    f"INSERT INTO tape_{tape_id}_info (key, value) VALUES (?, ?)",
-                    ("sym_key_hash", sha256_hex(final_key))
-                )
+                info_rows = [
+                    ("enc_sym_key", enc_sym_key),
+                    ("sym_key_hash", sha256_bytes(final_key)),
+                ]
                 console.print("[green]RSA key pair generated.[/]")
                 console.print(f"[yellow]IMPORTANT: Back up 'private.pem' in {key_dir}![/]")
             else:
@@ -265,7 +345,14 @@ def add_new_tapes():
                     "UPDATE tapes SET encrypted=0 WHERE tape_id=?", (tape_id,)
                 )
 
-            db.conn.commit()
+            with db.conn:
+                if info_rows:
+                    db.conn.executemany(
+                        "INSERT INTO tape_info (tape_id, key, value) VALUES (?, ?, ?)",
+                        [(tape_id, k, v) for k, v in info_rows]
+                    )
+            # Freshly written info rows must not be shadowed by a stale cache.
+            _tape_info_cache.pop(tape_id, None)
 
         print_success(f"Tape {tape_id} added.")
         if not confirm("Add another tape?"):
@@ -277,6 +364,8 @@ def add_new_tapes():
 # =============================================================================
 
 def backup_workflow():
+    from backup import run_backup_job
+
     tape_id, gen, is_enc = select_tape_interactive()
     if not tape_id:
         return
@@ -289,7 +378,13 @@ def backup_workflow():
         return
 
     path_in = input("Enter paths to backup (comma separated): ")
-    paths   = [p.strip() for p in path_in.split(",") if os.path.exists(p.strip())]
+    # One strip and one stat per entry; the old comprehension stripped
+    # each entry twice and silently stat'd empty strings.
+    paths = []
+    for raw in path_in.split(","):
+        p = raw.strip()
+        if p and os.path.exists(p):
+            paths.append(p)
     if not paths:
         print_error("No valid paths provided.")
         wait_for_keypress()
@@ -339,6 +434,8 @@ def backup_workflow():
 # =============================================================================
 
 def restore_workflow():
+    from restore import run_restore_job
+
     tape_id, gen, is_enc = select_tape_interactive()
     if not tape_id:
         return
@@ -396,6 +493,8 @@ def restore_workflow():
 # =============================================================================
 
 def browse_workflow():
+    from browse import browse
+
     tape_id, _, is_enc = select_tape_interactive()
     if not tape_id:
         return
@@ -409,6 +508,8 @@ def browse_workflow():
 
 
 def verify_workflow():
+    from verify import verify_tape_integrity
+
     tape_id, _, is_enc = select_tape_interactive()
     if not tape_id:
         return
@@ -465,18 +566,22 @@ def main():
             verify_workflow()
 
         elif choice == "6":
+            from labels import manage_labels_workflow
             manage_labels_workflow(db)
 
         elif choice == "7":
+            from search import search_workflow
             search_workflow(db)
 
         elif choice == "8":
+            from report import health_report_workflow
             health_report_workflow(db)
 
         elif choice == "9":
             header("🛟 Disaster Recovery Mode")
             tape_id = input("Enter Tape ID to recover from: ").strip()
             if tape_id:
+                from recovery import recover_database_from_tape
                 recover_database_from_tape(db, tape_id)
                 print_success(f"Database recovered from tape {tape_id}")
             else:
@@ -491,9 +596,6 @@ def main():
         elif choice == "0":
             if confirm("Are you sure you want to exit?"):
                 print_success("Goodbye.")
-                for i in range(3, 0, -1):
-                    console.print(f"[dim]Closing in {i}…[/]")
-                    time.sleep(1)
                 break
 
 
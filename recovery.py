@@ -1,10 +1,46 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 from pathlib import Path
+from tqdm import tqdm
 from ui import console, header
 from tape import TapeDevice
 
+# Manifest parsing is the CPU cost of recovery; orjson decodes several
+# times faster than stdlib json on large file lists, same optional-dep
+# pattern as the logger and config loader.
+try:
+    import orjson
+
+    def _load_manifest(path):
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+except ImportError:
+    def _load_manifest(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+# Hoisted so every execute hands sqlite3's statement cache the same text
+# (the cache is keyed on it) instead of re-parsing per job.
+_SQL_INSERT_JOB = (
+    "INSERT INTO jobs (job_id, tape_id, action, started_at, finished_at, "
+    "status, iv_hex, tag_hex, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_NODE = (
+    "INSERT INTO nodes (tape_id,id,parent_id,name,is_dir,size,mtime,job_id) "
+    "VALUES (?,?,?,?,?,?,?,?)"
+)
+
+
+def _load_manifest_safe(path):
+    """Pool worker: parse one manifest, reporting errors as a value."""
+    try:
+        return path, _load_manifest(path), None
+    except Exception as e:
+        return path, None, e
+
+
 def recover_database_from_tape(db, tape_id):
     """
     Scans the tape for 'job_*.json' files and rebuilds the SQLite database.
@@ -26,9 +62,14 @@ def recover_database_from_tape(db, tape_id):
         console.print(f"[red]Tape mount point not found: {mount_point}[/]")
         return
 
-    # Find all JSON metadata files
-    json_files = sorted(list(mount_point.glob("job_*.json")))
-    
+    # Find all JSON metadata files.  scandir avoids glob's pattern matcher
+    # and per-entry Path construction — one readdir pass over the mount.
+    json_files = sorted(
+        Path(e.path)
+        for e in os.scandir(mount_point)
+        if e.name.startswith("job_") and e.name.endswith(".json")
+    )
+
     if not json_files:
         console.print("[red]No metadata files found on this tape. Cannot perform smart recovery.[/]")
         return
@@ -44,59 +85,87 @@ def recover_database_from_tape(db, tape_id):
         db.add_tape(tape_id, gen, desc, encrypted=False)
 
     success_count = 0
-    
-    for jf in json_files:
-        try:
-            with open(jf, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-            
-            job_id = meta.get("job_id")
-            
-            # Check if job already exists
-            if db.conn.execute("SELECT 1 FROM jobs WHERE job_id=? AND tape_id=?", (job_id, tape_id)).fetchone():
-                console.print(f"[dim]Skipping Job #{job_id} (Already exists)[/]")
-                continue
-                
-            console.print(f"Restoring Job #{job_id}...", end="")
-            
-            crypto = meta.get("crypto", {})
-            iv_hex = crypto.get("iv_hex")
-            tag_hex = crypto.get("tag_hex")
-            size = meta.get("total_size", 0)
-            
-            # Update encryption status of tape if we detect encryption
-            if meta.get("encrypted"):
-                db.conn.execute("UPDATE tapes SET encrypted=1 WHERE tape_id=?", (tape_id,))
-            
-            # Insert Job
-            db.conn.execute(
-                """INSERT INTO jobs (job_id, tape_id, action, started_at, finished_at, status, iv_hex, tag_hex, size)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (job_id, tape_id, "BACKUP", meta.get("timestamp"), meta.get("timestamp"), "SUCCESS", iv_hex, tag_hex, size)
-            )
-            
-            # Restore File Index (Flattened)
-            files = meta.get("files", [])
-            for file_info in files:
-                db.insert_node(
-                    tape_id, 
-                    None, # Parent structure is flattened in recovery for now
-                    file_info["name"], 
-                    int(file_info["is_dir"]), 
-                    file_info["size"], 
-                    job_id
+
+    # One transaction for the whole rebuild: one fsync instead of one per
+    # job, and file rows go in via a single executemany per job with
+    # pre-assigned ids.  A savepoint around each job keeps a corrupt
+    # manifest from poisoning the rest; Ctrl+C rolls the lot back.
+    # One query for all known job ids up front; the duplicate check in
+    # the loop is then a set lookup instead of a SELECT per manifest.
+    existing = {
+        r[0] for r in
+        db.conn.execute("SELECT job_id FROM jobs WHERE tape_id=?", (tape_id,))
+    }
+
+    # Manifests are read and parsed on a small thread pool so the next
+    # file's read/decode overlaps the current job's DB work; all writes
+    # stay on this thread to keep the single-transaction batching.
+    loader = ThreadPoolExecutor(max_workers=8)
+    db.conn.execute("BEGIN IMMEDIATE")
+    pbar = tqdm(total=len(json_files), unit="job", desc="Rebuilding index")
+    try:
+        for jf, meta, err in loader.map(_load_manifest_safe, json_files):
+            pbar.update(1)
+            db.conn.execute("SAVEPOINT recover_job")
+            try:
+                if err is not None:
+                    raise err
+
+                job_id = meta.get("job_id")
+
+                # Check if job already exists
+                if job_id in existing:
+                    pbar.write(f"Skipping Job #{job_id} (Already exists)")
+                    continue
+                existing.add(job_id)
+
+                crypto = meta.get("crypto", {})
+                iv_hex = crypto.get("iv_hex")
+                tag_hex = crypto.get("tag_hex")
+                size = meta.get("total_size", 0)
+
+                # Update encryption status of tape if we detect encryption
+                if meta.get("encrypted"):
+                    db.conn.execute("UPDATE tapes SET encrypted=1 WHERE tape_id=?", (tape_id,))
+
+                # Insert Job
+                db.conn.execute(
+                    _SQL_INSERT_JOB,
+                    (job_id, tape_id, "BACKUP", meta.get("timestamp"), meta.get("timestamp"), "SUCCESS", iv_hex, tag_hex, size)
                 )
-            
-            db.conn.commit()
-            console.print(f" [green]Done[/]")
-            success_count += 1
-            
-        except Exception as e:
-            console.print(f" [red]Error reading {jf.name}: {e}[/]")
-
-    # Recalculate used capacity
-    total_used = db.conn.execute("SELECT SUM(size) FROM jobs WHERE tape_id=?", (tape_id,)).fetchone()[0] or 0
-    db.conn.execute("UPDATE tapes SET used_capacity=? WHERE tape_id=?", (total_used, tape_id))
-    db.conn.commit()
-    
+
+                # Restore File Index (flattened: parent structure unknown here)
+                files = meta.get("files", [])
+                base  = db.next_node_id(tape_id)
+                db.conn.executemany(
+                    _SQL_INSERT_NODE,
+                    (
+                        (tape_id, base + idx, None, f["name"],
+                         int(f["is_dir"]), f["size"], 0.0, job_id)
+                        for idx, f in enumerate(files)
+                    )
+                )
+
+                pbar.write(f"Job #{job_id} restored")
+                success_count += 1
+
+            except Exception as e:
+                db.conn.execute("ROLLBACK TO recover_job")
+                pbar.write(f"Error reading {jf.name}: {e}")
+            finally:
+                db.conn.execute("RELEASE recover_job")
+
+        # Recalculate used capacity inside the same transaction
+        total_used = db.conn.execute("SELECT SUM(size) FROM jobs WHERE tape_id=?", (tape_id,)).fetchone()[0] or 0
+        db.conn.execute("UPDATE tapes SET used_capacity=? WHERE tape_id=?", (total_used, tape_id))
+        db.conn.commit()
+    except KeyboardInterrupt:
+        db.conn.rollback()
+        pbar.close()
+        console.print("\n[yellow]Recovery aborted — nothing was written.[/]")
+        return
+    finally:
+        loader.shutdown(cancel_futures=True)
+        pbar.close()
+
     console.print(f"\n[bold green]Recovery Complete! {success_count} jobs restored.[/]")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
-from datetime import datetime, timezone
+import sqlite3
+from datetime import date, datetime, timezone
 from config_manager import cfg
 from ui import console, header, wait_for_keypress
 
@@ -8,6 +9,11 @@ from ui import console, header, wait_for_keypress
 # HEALTH SCORING
 # =============================================================================
 
+# Verify outcomes that make a tape critical on their own.  Module-level
+# frozenset: no per-call tuple allocation, O(1) membership.
+_CRITICAL_VERIFY = frozenset({"FAILED", "CORRUPTED", "PARTIAL"})
+
+
 def _health_status(usage_pct, last_verify_result, success_rate, days_since_backup):
     """
     Return 'critical', 'warning', or 'good' based on four health indicators.
@@ -25,7 +31,7 @@ def _health_status(usage_pct, last_verify_result, success_rate, days_since_backu
     """
     if usage_pct > 95:
         return "critical"
-    if last_verify_result in ("FAILED", "CORRUPTED", "PARTIAL"):
+    if last_verify_result in _CRITICAL_VERIFY:
         return "critical"
     if success_rate is not None and success_rate < 0.60:
         return "critical"
@@ -46,60 +52,73 @@ def _health_status(usage_pct, last_verify_result, success_rate, days_since_backu
 # DATA COLLECTION
 # =============================================================================
 
+_SQL_TAPE_ROWS = (
+    "SELECT tape_id, generation, encrypted, description, used_capacity "
+    "FROM tapes ORDER BY tape_id"
+)
+_SQL_BACKUP_STATS = (
+    "SELECT tape_id, COUNT(*), "
+    "       SUM(status='FAILED'), "
+    "       MAX(CASE WHEN status='SUCCESS' THEN finished_at END) "
+    "FROM jobs WHERE action='BACKUP' GROUP BY tape_id"
+)
+_SQL_LAST_VERIFIES = (
+    "SELECT tape_id, status, finished_at FROM jobs "
+    "WHERE action='VERIFY' AND job_id IN "
+    "  (SELECT MAX(job_id) FROM jobs WHERE action='VERIFY' GROUP BY tape_id)"
+)
+
+
 def _collect_tape_data(db, now):
     """Build a list of per-tape stat dicts for the report."""
-    tape_rows = db.conn.execute(
-        "SELECT tape_id, generation, encrypted, description, used_capacity "
-        "FROM tapes ORDER BY tape_id"
-    ).fetchall()
+    # Row factory on a local cursor only — the shared connection keeps
+    # returning plain tuples for the rest of the app.  Rows give named
+    # access without a per-row unpack, and slice like tuples below.
+    cur = db.conn.cursor()
+    cur.row_factory = sqlite3.Row
+    tape_rows = cur.execute(_SQL_TAPE_ROWS).fetchall()
+
+    # Three grouped queries instead of 3-4 per tape: each loads into a
+    # {tape_id: …} dict once, and the tape loop below is pure lookups.
+    backup_stats = {
+        row[0]: row[1:] for row in cur.execute(_SQL_BACKUP_STATS)
+    }
+    last_verifies = {
+        row[0]: row[1:] for row in cur.execute(_SQL_LAST_VERIFIES)
+    }
+    label_map = db.get_all_tape_labels()
 
     tapes_data = []
-    for tape_id, generation, encrypted, description, used_capacity in tape_rows:
+    for r in tape_rows:
+        tape_id, generation = r["tape_id"], r["generation"]
+        # Memoized inside ConfigManager — repeat calls here are dict hits.
         gen_info = cfg.get_generation_info(generation)
         max_cap  = gen_info.get("capacity", 1)
-        usage_pct = used_capacity / max_cap * 100 if max_cap > 0 else 0
-
-        labels = db.get_labels_for_tape(tape_id)
-
-        # Backup job stats
-        backup_jobs = db.conn.execute(
-            "SELECT status, finished_at FROM jobs "
-            "WHERE tape_id=? AND action='BACKUP'",
-            (tape_id,)
-        ).fetchall()
-        total_jobs  = len(backup_jobs)
-        failed_jobs = sum(1 for s, _ in backup_jobs if s == "FAILED")
+        usage_pct = r["used_capacity"] / max_cap * 100 if max_cap > 0 else 0
+
+        labels = label_map.get(tape_id, [])
+
+        total_jobs, failed_jobs, last_backup_ts = backup_stats.get(
+            tape_id, (0, 0, None)
+        )
+        failed_jobs = failed_jobs or 0
         success_rate = (
             (total_jobs - failed_jobs) / total_jobs if total_jobs > 0 else None
         )
 
-        # Last successful backup timestamp
-        last_bk_row = db.conn.execute(
-            "SELECT MAX(finished_at) FROM jobs "
-            "WHERE tape_id=? AND status='SUCCESS' AND action='BACKUP'",
-            (tape_id,)
-        ).fetchone()
-        last_backup_ts = last_bk_row[0] if last_bk_row else None
-
         days_since_backup = None
         if last_backup_ts:
             try:
-                dt = datetime.fromisoformat(last_backup_ts)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                days_since_backup = (now - dt).days
+                # Timestamps are ISO-8601; only the integer day delta
+                # matters here, so parse just the date part and skip the
+                # time/tzinfo machinery of a full fromisoformat.
+                days_since_backup = (
+                    now.date() - date.fromisoformat(last_backup_ts[:10])
+                ).days
             except Exception:
                 pass
 
-        # Last verify result
-        verify_row = db.conn.execute(
-            "SELECT status, finished_at FROM jobs "
-            "WHERE tape_id=? AND action='VERIFY' "
-            "ORDER BY job_id DESC LIMIT 1",
-            (tape_id,)
-        ).fetchone()
-        last_verify_result = verify_row[0] if verify_row else None
-        last_verify_ts     = verify_row[1] if verify_row else None
+        last_verify_result, last_verify_ts = last_verifies.get(tape_id, (None, None))
 
         health = _health_status(
             usage_pct, last_verify_result, success_rate, days_since_backup
@@ -108,10 +127,10 @@ def _collect_tape_data(db, now):
         tapes_data.append({
             "tape_id":           tape_id,
             "generation":        gen_info.get("name", generation),
-            "encrypted":         bool(encrypted),
-            "description":       description or "",
+            "encrypted":         bool(r["encrypted"]),
+            "description":       r["description"] or "",
             "labels":            labels,
-            "used_gb":           used_capacity / 1024 ** 3,
+            "used_gb":           r["used_capacity"] / 1024 ** 3,
             "max_gb":            max_cap / 1024 ** 3,
             "usage_pct":         usage_pct,
             "total_jobs":        total_jobs,
@@ -142,15 +161,25 @@ def _fmt_ts(ts):
         return ts
 
 
+# Lookup tables for the per-row helpers below — built once at import
+# instead of on every call.
+_USAGE_COLORS = ((95, "#f44336"), (80, "#ff9800"), (0, "#4caf50"))
+_HEALTH_CFG = {
+    "good":     ("🟢", "good",     "Good"),
+    "warning":  ("🟡", "warning",  "Warning"),
+    "critical": ("🔴", "critical", "Critical"),
+}
+_VERIFY_CFG = {
+    "SUCCESS": ("✅", "#4caf50", "Passed"),
+    "FAILED":  ("❌", "#f44336", "Failed"),
+    "PARTIAL": ("⚠️",  "#ff9800", "Partial"),
+}
+
+
 def _usage_bar(pct):
     """HTML snippet for a colour-coded usage progress bar."""
     clamped = min(max(pct, 0), 100)
-    if clamped > 95:
-        color = "#f44336"
-    elif clamped > 80:
-        color = "#ff9800"
-    else:
-        color = "#4caf50"
+    color = next(c for threshold, c in _USAGE_COLORS if clamped > threshold or threshold == 0)
     return (
         f'<div class="bar-wrap">'
         f'<div class="bar-fill" style="width:{clamped:.1f}%;background:{color}"></div>'
@@ -161,24 +190,14 @@ def _usage_bar(pct):
 
 def _health_badge(status):
     """Coloured badge HTML for a health status string."""
-    cfg_map = {
-        "good":     ("🟢", "good",     "Good"),
-        "warning":  ("🟡", "warning",  "Warning"),
-        "critical": ("🔴", "critical", "Critical"),
-    }
-    icon, css, label = cfg_map.get(status, ("⚪", "good", status.capitalize()))
+    icon, css, label = _HEALTH_CFG.get(status, ("⚪", "good", status.capitalize()))
     return f'<span class="badge badge-{css}">{icon} {label}</span>'
 
 
 def _verify_badge(result):
-    cfg_map = {
-        "SUCCESS": ("✅", "#4caf50", "Passed"),
-        "FAILED":  ("❌", "#f44336", "Failed"),
-        "PARTIAL": ("⚠️",  "#ff9800", "Partial"),
-    }
     if result is None:
         return '<span style="color:#888">Never</span>'
-    icon, color, label = cfg_map.get(result, ("ℹ️", "#888", result))
+    icon, color, label = _VERIFY_CFG.get(result, ("ℹ️", "#888", result))
     return f'<span style="color:{color}">{icon} {label}</span>'
 
 
@@ -186,7 +205,50 @@ def _verify_badge(result):
 # FULL HTML GENERATION
 # =============================================================================
 
-def _render_html(summary, tapes_data):
+def _render_row(t):
+    """One <tr> of the tape table, from a _collect_tape_data dict."""
+    label_chips = "".join(
+        f'<span class="chip">{l}</span>' for l in t["labels"]
+    ) or '<span style="color:#555">—</span>'
+
+    enc_badge = (
+        '<span class="badge badge-enc">🔒 Encrypted</span>'
+        if t["encrypted"]
+        else '<span class="badge badge-plain">🔓 Plain</span>'
+    )
+
+    rate_str = (
+        f"{t['success_rate'] * 100:.0f}%"
+        if t["success_rate"] is not None else "—"
+    )
+    jobs_str = f"{t['total_jobs'] - t['failed_jobs']}/{t['total_jobs']}"
+
+    last_bk_str = _fmt_ts(t["last_backup_ts"])
+    if t["days_since_backup"] is not None:
+        last_bk_str += f' <span class="dim">({t["days_since_backup"]}d ago)</span>'
+
+    return f"""
+        <tr>
+          <td><strong>{t['tape_id']}</strong><br><span class="dim">{t['description']}</span></td>
+          <td>{t['generation']}</td>
+          <td>{enc_badge}</td>
+          <td>{label_chips}</td>
+          <td>
+            {_usage_bar(t['usage_pct'])}
+            <span class="dim">{t['used_gb']:.2f} / {t['max_gb']:.2f} GB</span>
+          </td>
+          <td>{jobs_str}<br><span class="dim">({rate_str} success)</span></td>
+          <td>{last_bk_str}</td>
+          <td>
+            {_verify_badge(t['last_verify_result'])}
+            <br><span class="dim">{_fmt_ts(t['last_verify_ts'])}</span>
+          </td>
+          <td>{_health_badge(t['health'])}</td>
+        </tr>
+        """
+
+
+def _write_html(out, summary, tapes_data):
     # ---- Summary cards --------------------------------------------------------
     total_used_str = f"{summary['total_used_tb']:.2f} TB"
     total_cap_str  = f"{summary['total_cap_tb']:.2f} TB"
@@ -220,96 +282,89 @@ def _render_html(summary, tapes_data):
     </div>
     """
 
-    # ---- Per-tape rows --------------------------------------------------------
-    rows_html = ""
-    for t in tapes_data:
-        label_chips = "".join(
-            f'<span class="chip">{l}</span>' for l in t["labels"]
-        ) or '<span style="color:#555">—</span>'
-
-        enc_badge = (
-            '<span class="badge badge-enc">🔒 Encrypted</span>'
-            if t["encrypted"]
-            else '<span class="badge badge-plain">🔓 Plain</span>'
-        )
-
-        rate_str = (
-            f"{t['success_rate'] * 100:.0f}%"
-            if t["success_rate"] is not None else "—"
-        )
-        jobs_str = f"{t['total_jobs'] - t['failed_jobs']}/{t['total_jobs']}"
-
-        last_bk_str = _fmt_ts(t["last_backup_ts"])
-        if t["days_since_backup"] is not None:
-            last_bk_str += f' <span class="dim">({t["days_since_backup"]}d ago)</span>'
-
-        rows_html += f"""
-        <tr>
-          <td><strong>{t['tape_id']}</strong><br><span class="dim">{t['description']}</span></td>
-          <td>{t['generation']}</td>
-          <td>{enc_badge}</td>
-          <td>{label_chips}</td>
-          <td>
-            {_usage_bar(t['usage_pct'])}
-            <span class="dim">{t['used_gb']:.2f} / {t['max_gb']:.2f} GB</span>
-          </td>
-          <td>{jobs_str}<br><span class="dim">({rate_str} success)</span></td>
-          <td>{last_bk_str}</td>
-          <td>
-            {_verify_badge(t['last_verify_result'])}
-            <br><span class="dim">{_fmt_ts(t['last_verify_ts'])}</span>
-          </td>
-          <td>{_health_badge(t['health'])}</td>
-        </tr>
-        """
-
     # ---- Full HTML document ---------------------------------------------------
-    return f"""<!DOCTYPE html>
+    # Streamed straight to the (buffered) file object: the full document is
+    # never assembled in memory, rows are rendered and written one at a
+    # time.  Static scaffolding comes from the module-level constants
+    # below; only the generated_at slots and the dynamic sections are
+    # formatted.
+    out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
   <title>LTO Health Report — {summary['generated_at']}</title>
-  <style>
-    *, *::before, *::after {{ box-sizing: border-box; margin: 0; padding: 0; }}
+""")
+    out.write(_HTML_STYLE)
+    out.write(f"""</head>
+<body>
+
+<div class="page-header">
+  <h1>📼 LTO Backup — Health Report</h1>
+  <div class="meta">Generated: {summary['generated_at']}</div>
+</div>
+
+<div class="content">
 
-    body {{
+  {cards_html}
+""")
+    out.write(_TABLE_HEAD)
+    for t in tapes_data:
+        out.write(_render_row(t))
+    out.write(_TABLE_TAIL)
+    out.write(f"""
+<div class="footer">
+  LTO Backup &amp; Manage System — Health Report
+  &nbsp;·&nbsp; Generated {summary['generated_at']}
+</div>
+
+</body>
+</html>
+""")
+
+
+# Static CSS/markup shared by every report — one interned literal each,
+# never re-rendered through the f-string machinery.
+_HTML_STYLE = """  <style>
+    *, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
+
+    body {
       background: #0d0d1a;
       color: #d0d0e8;
       font-family: 'Consolas', 'Courier New', monospace;
       font-size: 14px;
       line-height: 1.6;
-    }}
+    }
 
     /* ---- Header ---- */
-    .page-header {{
+    .page-header {
       background: linear-gradient(135deg, #1a1a3e 0%, #0d0d1a 100%);
       border-bottom: 1px solid #2a2a5a;
       padding: 28px 40px 20px;
-    }}
-    .page-header h1 {{
+    }
+    .page-header h1 {
       font-size: 1.8em;
       color: #7ab4ff;
       letter-spacing: 2px;
       text-transform: uppercase;
-    }}
-    .page-header .meta {{
+    }
+    .page-header .meta {
       color: #557;
       margin-top: 4px;
       font-size: 0.85em;
-    }}
+    }
 
     /* ---- Layout wrapper ---- */
-    .content {{ padding: 30px 40px; }}
+    .content { padding: 30px 40px; }
 
     /* ---- Summary cards ---- */
-    .cards {{
+    .cards {
       display: flex;
       gap: 18px;
       margin-bottom: 36px;
       flex-wrap: wrap;
-    }}
-    .card {{
+    }
+    .card {
       background: #141428;
       border: 1px solid #2a2a5a;
       border-radius: 10px;
@@ -317,13 +372,13 @@ def _render_html(summary, tapes_data):
       flex: 1;
       min-width: 180px;
       text-align: center;
-    }}
-    .card-icon  {{ font-size: 1.8em; margin-bottom: 8px; }}
-    .card-value {{ font-size: 2em; font-weight: bold; color: #7ab4ff; }}
-    .card-label {{ color: #668; font-size: 0.82em; margin-top: 4px; }}
+    }
+    .card-icon  { font-size: 1.8em; margin-bottom: 8px; }
+    .card-value { font-size: 2em; font-weight: bold; color: #7ab4ff; }
+    .card-label { color: #668; font-size: 0.82em; margin-top: 4px; }
 
     /* ---- Section title ---- */
-    .section-title {{
+    .section-title {
       font-size: 1em;
       letter-spacing: 2px;
       text-transform: uppercase;
@@ -331,14 +386,14 @@ def _render_html(summary, tapes_data):
       margin-bottom: 14px;
       border-bottom: 1px solid #2a2a5a;
       padding-bottom: 6px;
-    }}
+    }
 
     /* ---- Table ---- */
-    .tape-table {{
+    .tape-table {
       width: 100%;
       border-collapse: collapse;
-    }}
-    .tape-table th {{
+    }
+    .tape-table th {
       background: #1a1a3e;
       color: #8ab;
       font-size: 0.78em;
@@ -347,16 +402,16 @@ def _render_html(summary, tapes_data):
       padding: 10px 14px;
       text-align: left;
       border-bottom: 2px solid #2a2a5a;
-    }}
-    .tape-table td {{
+    }
+    .tape-table td {
       padding: 12px 14px;
       border-bottom: 1px solid #1e1e3a;
       vertical-align: middle;
-    }}
-    .tape-table tr:hover td {{ background: #141428; }}
+    }
+    .tape-table tr:hover td { background: #141428; }
 
     /* ---- Usage bar ---- */
-    .bar-wrap {{
+    .bar-wrap {
       background: #1e1e3a;
       border-radius: 4px;
       height: 10px;
@@ -365,30 +420,30 @@ def _render_html(summary, tapes_data):
       display: inline-block;
       vertical-align: middle;
       margin-right: 6px;
-    }}
-    .bar-fill {{
+    }
+    .bar-fill {
       height: 100%;
       border-radius: 4px;
       transition: width 0.3s;
-    }}
-    .bar-label {{ font-size: 0.8em; color: #aaa; }}
+    }
+    .bar-label { font-size: 0.8em; color: #aaa; }
 
     /* ---- Badges ---- */
-    .badge {{
+    .badge {
       display: inline-block;
       padding: 2px 8px;
       border-radius: 12px;
       font-size: 0.78em;
       font-weight: bold;
-    }}
-    .badge-good     {{ background: #1a3a1a; color: #4caf50; border: 1px solid #2d6b2d; }}
-    .badge-warning  {{ background: #3a2a10; color: #ff9800; border: 1px solid #7a5200; }}
-    .badge-critical {{ background: #3a1010; color: #f44336; border: 1px solid #7a2020; }}
-    .badge-enc      {{ background: #1a2540; color: #6699ff; border: 1px solid #2244aa; }}
-    .badge-plain    {{ background: #1a3020; color: #66aa66; border: 1px solid #225522; }}
+    }
+    .badge-good     { background: #1a3a1a; color: #4caf50; border: 1px solid #2d6b2d; }
+    .badge-warning  { background: #3a2a10; color: #ff9800; border: 1px solid #7a5200; }
+    .badge-critical { background: #3a1010; color: #f44336; border: 1px solid #7a2020; }
+    .badge-enc      { background: #1a2540; color: #6699ff; border: 1px solid #2244aa; }
+    .badge-plain    { background: #1a3020; color: #66aa66; border: 1px solid #225522; }
 
     /* ---- Label chips ---- */
-    .chip {{
+    .chip {
       display: inline-block;
       background: #1e2850;
       color: #88aaff;
@@ -397,33 +452,24 @@ def _render_html(summary, tapes_data):
       padding: 1px 8px;
       font-size: 0.76em;
       margin: 1px 2px;
-    }}
+    }
 
     /* ---- Misc ---- */
-    .dim {{ color: #557; }}
+    .dim { color: #557; }
 
     /* ---- Footer ---- */
-    .footer {{
+    .footer {
       text-align: center;
       color: #335;
       font-size: 0.78em;
       padding: 24px 40px;
       border-top: 1px solid #1a1a3a;
       margin-top: 40px;
-    }}
+    }
   </style>
-</head>
-<body>
-
-<div class="page-header">
-  <h1>📼 LTO Backup — Health Report</h1>
-  <div class="meta">Generated: {summary['generated_at']}</div>
-</div>
-
-<div class="content">
-
-  {cards_html}
+"""
 
+_TABLE_HEAD = """
   <div class="section-title">Tape Health Overview</div>
 
   <table class="tape-table">
@@ -441,19 +487,13 @@ def _render_html(summary, tapes_data):
       </tr>
     </thead>
     <tbody>
-      {rows_html}
+"""
+
+_TABLE_TAIL = """
     </tbody>
   </table>
 
 </div>
-
-<div class="footer">
-  LTO Backup &amp; Manage System — Health Report
-  &nbsp;·&nbsp; Generated {summary['generated_at']}
-</div>
-
-</body>
-</html>
 """
 
 
@@ -479,11 +519,14 @@ def generate_health_report(db, output_path="health_report.html"):
     ).fetchone()
     last_backup = last_backup_row[0] if last_backup_row else None
 
-    # Total theoretical capacity across all registered tapes
-    all_gen_rows = db.conn.execute("SELECT generation FROM tapes").fetchall()
+    # Total theoretical capacity: count per generation in SQL, then one
+    # capacity lookup per distinct generation instead of per tape.
+    gen_counts = db.conn.execute(
+        "SELECT generation, COUNT(*) FROM tapes GROUP BY generation"
+    ).fetchall()
     total_cap = sum(
-        cfg.get_generation_info(g[0]).get("capacity", 0)
-        for g in all_gen_rows
+        cfg.get_generation_info(g).get("capacity", 0) * count
+        for g, count in gen_counts
     )
 
     summary = {
@@ -496,10 +539,8 @@ def generate_health_report(db, output_path="health_report.html"):
     }
 
     tapes_data = _collect_tape_data(db, now)
-    html = _render_html(summary, tapes_data)
-
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+        _write_html(f, summary, tapes_data)
 
     return output_path
 
@@ -1,23 +1,150 @@
+import json
+import queue
 import tarfile
+import threading
+from pathlib import Path
 from tqdm import tqdm
 from tape import TapeDevice
 from crypto import DecryptionReader
 
+
+class PrefetchingReader:
+    """
+    Read-ahead wrapper: a background thread keeps a couple of large
+    chunks queued so the tape drive streams while tarfile extracts the
+    previous block, instead of stalling on every synchronous read.
+    """
+
+    # Two 4 MiB chunks in flight — enough to cover extraction pauses
+    # without holding much memory.
+    _CHUNK = 4 * 1024 * 1024
+    _DEPTH = 2
+
+    def __init__(self, wrapped_file):
+        self._file = wrapped_file
+        self._q = queue.Queue(maxsize=self._DEPTH)
+        self._buf = b""
+        self._pos = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while True:
+                chunk = self._file.read(self._CHUNK)
+                self._q.put(chunk)
+                if not chunk:
+                    break
+        except Exception as e:
+            # Surface read errors on the consumer side
+            self._q.put(e)
+
+    def _next_chunk(self):
+        if self._eof:
+            return b""
+        item = self._q.get()
+        if isinstance(item, Exception):
+            self._eof = True
+            raise item
+        if not item:
+            self._eof = True
+        return item
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self._buf[self._pos:]]
+            self._buf = b""
+            self._pos = 0
+            while True:
+                chunk = self._next_chunk()
+                if not chunk:
+                    break
+                parts.append(chunk)
+            return b"".join(parts)
+
+        while len(self._buf) - self._pos < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buf = self._buf[self._pos:] + chunk
+            self._pos = 0
+        data = self._buf[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+
 class ProgressReader:
     """Wraps file reading to update progress bar."""
+
+    # tarfile reads plaintext archives in 10 KiB blocks, and tqdm.update
+    # is pure Python — per-call updates mean ~100 bar updates per MB.
+    # Batch them: the bar still refreshes many times a second at tape
+    # speed, but the Python cost drops by two orders of magnitude.
+    _UPDATE_EVERY = 1024 * 1024
+
     def __init__(self, wrapped_file, size, pbar):
         self._file = wrapped_file
         self.size = size
         self.read_so_far = 0
         self._bar = pbar
+        self._pending = 0
 
     def read(self, size=-1):
         data = self._file.read(size)
         if data:
-            self._bar.update(len(data))
-            self.read_so_far += len(data)
+            n = len(data)
+            self.read_so_far += n
+            self._pending += n
+            if self._pending >= self._UPDATE_EVERY:
+                self._bar.update(self._pending)
+                self._pending = 0
+        elif self._pending:
+            # EOF: flush the remainder so the bar lands on the exact total.
+            # tarfile in stream mode stops at the end-of-archive marker and
+            # never issues this empty read, so the consumer must also call
+            # flush() explicitly before closing the bar.
+            self.flush()
         return data
 
+    def flush(self):
+        """Push any batched byte count into the bar (call at end of stream)."""
+        if self._pending:
+            self._bar.update(self._pending)
+            self._pending = 0
+
+def _apply_recorded_moves(tape, job_id, out_dir):
+    """
+    Replay renames recorded in the job manifest.
+
+    Incremental backups don't re-archive a file whose content is already on
+    tape under an old path; the manifest entry carries "moved_from" instead.
+    When a job chain is restored into one directory, the old path exists
+    from an earlier job's extraction — move it into place here.
+
+    Returns the number of files moved.
+    """
+    manifest_path = tape.mount_point / f"job_{job_id}.json"
+    if not manifest_path.exists():
+        return 0
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    moved = 0
+    out_root = Path(out_dir)
+    for entry in meta.get("files", []):
+        src = entry.get("moved_from")
+        if not src:
+            continue
+        old_path = out_root / src
+        new_path = out_root / entry["rel_path"]
+        if old_path.is_file() and not new_path.exists():
+            new_path.parent.mkdir(parents=True, exist_ok=True)
+            old_path.replace(new_path)
+            moved += 1
+    return moved
+
+
 def run_restore_job(db, tape_id, job_id, out_dir, key=None):
     row = db.conn.execute(
         "SELECT size, iv_hex, tag_hex FROM jobs WHERE job_id=? AND tape_id=?", 
@@ -32,7 +159,9 @@ def run_restore_job(db, tape_id, job_id, out_dir, key=None):
     raw_tape_file = tape.get_reader(job_id, encrypted=(key is not None))
     
     pbar = tqdm(total=size, unit='B', unit_scale=True, desc="Verifying & Restoring")
-    progress_reader = ProgressReader(raw_tape_file, size, pbar)
+    # Read-ahead sits closest to the tape so the drive keeps streaming
+    # while decryption/extraction work on the chunk already in memory.
+    progress_reader = ProgressReader(PrefetchingReader(raw_tape_file), size, pbar)
 
     final_reader = progress_reader
 
@@ -47,7 +176,12 @@ def run_restore_job(db, tape_id, job_id, out_dir, key=None):
     try:
         with tarfile.open(fileobj=final_reader, mode='r|') as tar:
             tar.extractall(out_dir)
-        
+
+        moved = _apply_recorded_moves(tape, job_id, out_dir)
+        if moved:
+            print(f"Replayed {moved} recorded move(s) from the job manifest.")
+
+        progress_reader.flush()
         pbar.close()
         raw_tape_file.close()
         print(f"Restore Successful. Integrity verified.")
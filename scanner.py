@@ -1,8 +1,49 @@
+import queue
+import threading
+
 import cv2
 import numpy as np
-from pyzbar.pyzbar import decode
+from pyzbar.pyzbar import decode, ZBarSymbol
 from ui import console
 
+# LTO cartridge labels are Code 39 (occasionally Code 128); telling zbar to
+# skip every other symbology roughly halves decode time per frame.
+_LTO_SYMBOLS = [ZBarSymbol.CODE39, ZBarSymbol.CODE128]
+
+# Fraction of the frame (per side) cropped away before decoding.  Decode
+# cost scales with pixel count, and the user naturally centres the label,
+# so scanning only the middle 60% is ~3x less work with no practical loss.
+_ROI_MARGIN = 0.2
+
+# Barcodes stay readable well below capture resolution; shrinking the ROI
+# to this width before decoding cuts zbar's per-frame pixel work again,
+# on top of the crop.
+_DECODE_WIDTH = 640
+
+
+def _capture_frames(cap, frame_q, stop):
+    """
+    Producer loop: grab frames and keep only the newest one in the queue.
+    With a size-1 queue the decoder always works on the freshest frame
+    instead of chewing through a backlog of stale ones.
+    """
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        try:
+            frame_q.put_nowait(frame)
+        except queue.Full:
+            try:
+                frame_q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                frame_q.put_nowait(frame)
+            except queue.Full:
+                pass
+    stop.set()  # camera gone: let the decode loop exit too
+
 
 def scan_barcode_from_camera():
     """
@@ -17,15 +58,47 @@ def scan_barcode_from_camera():
     if not cap.isOpened():
         console.print("[red]Error: Could not open camera.[/]")
         return None
+    # 720p is plenty for a barcode at arm's length; full-res frames just
+    # multiply decode and colour-conversion cost.
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
 
     detected_code = None
 
+    # Camera grabs run on their own thread so a slow decode never blocks
+    # capture (and vice versa); see _capture_frames for the queue policy.
+    # Decode and the cv2 window stay on this thread — HighGUI is not
+    # thread-safe, so this is the side that must own imshow/waitKey.
+    frame_q = queue.Queue(maxsize=1)
+    stop    = threading.Event()
+    grabber = threading.Thread(
+        target=_capture_frames, args=(cap, frame_q, stop), daemon=True
+    )
+    grabber.start()
+
     while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+        try:
+            frame = frame_q.get(timeout=0.5)
+        except queue.Empty:
+            if stop.is_set():
+                break
+            continue
+
+        # Decode only a downscaled grayscale centre ROI; overlay coordinates
+        # are mapped back into full-frame space below.
+        h, w = frame.shape[:2]
+        rx, ry = int(w * _ROI_MARGIN), int(h * _ROI_MARGIN)
+        gray_roi = cv2.cvtColor(frame[ry:h - ry, rx:w - rx], cv2.COLOR_BGR2GRAY)
+        scale = 1.0
+        if gray_roi.shape[1] > _DECODE_WIDTH:
+            scale = _DECODE_WIDTH / gray_roi.shape[1]
+            gray_roi = cv2.resize(
+                gray_roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+            )
+        decoded_objects = decode(gray_roi, symbols=_LTO_SYMBOLS)
 
-        decoded_objects = decode(frame)
+        # Show the user where to hold the label
+        cv2.rectangle(frame, (rx, ry), (w - rx, h - ry), (80, 80, 80), 1)
 
         for obj in decoded_objects:
             detected_code = obj.data.decode("utf-8")
@@ -33,14 +106,17 @@ def scan_barcode_from_camera():
             # Draw the barcode boundary polygon
             points = obj.polygon
             if len(points) >= 4:
-                pts = np.array([[p.x, p.y] for p in points], dtype=np.int32)
+                pts = np.array(
+                    [[int(p.x / scale) + rx, int(p.y / scale) + ry] for p in points],
+                    dtype=np.int32
+                )
                 cv2.polylines(
                     frame, [pts], isClosed=True,
                     color=(0, 255, 0), thickness=3, lineType=cv2.LINE_AA
                 )
 
                 # Highlight the top-left corner so orientation is obvious
-                cv2.circle(frame, (points[0].x, points[0].y), 6, (0, 0, 255), -1)
+                cv2.circle(frame, tuple(pts[0]), 6, (0, 0, 255), -1)
 
             # Measure text dimensions so we can draw a filled background box
             label = detected_code
@@ -78,6 +154,9 @@ def scan_barcode_from_camera():
         if cv2.waitKey(1) & 0xFF == ord("q"):
             break
 
+    # Stop the grabber before releasing the capture it reads from.
+    stop.set()
+    grabber.join(timeout=1.0)
     cap.release()
     cv2.destroyAllWindows()
     return detected_code
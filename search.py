@@ -1,7 +1,8 @@
+import hmac
 import os
 from rich.table import Table
 from ui import console, header, wait_for_keypress
-from crypto import decrypt_name, decrypt_symmetric_key, sha256_hex
+from crypto import decrypt_names_bulk, decrypt_symmetric_key, sha256_bytes, sha256_hex
 from config_manager import cfg
 
 
@@ -9,6 +10,20 @@ from config_manager import cfg
 # SILENT RSA UNLOCK
 # =============================================================================
 
+# Decrypted name listings per encrypted tape, keyed by a cheap version
+# tag (row count + newest job id) so a new backup invalidates the entry.
+# Repeat searches — the common case in the interactive workflow — then
+# skip the whole bulk decrypt and scan plaintext in memory.  Plaintext
+# tapes are not cached: their filter already runs inside SQLite.
+_name_snapshot_cache = {}
+
+# Symmetric keys recovered by earlier unlocks this session.  The RSA
+# private-key operation dominates a cross-tape search, so repeat searches
+# should pay it once per tape; entries are keyed on the pem's mtime and
+# the stored ciphertext, so re-keying a tape invalidates them naturally.
+_sym_key_cache = {}
+
+
 def auto_unlock_rsa(db, tape_id):
     """
     Attempt to silently unlock an RSA-encrypted tape.
@@ -26,22 +41,36 @@ def auto_unlock_rsa(db, tape_id):
         return None
 
     try:
-        rows = db.conn.execute(
-            f"SELECT key, value FROM tape_{tape_id}_info"
-        ).fetchall()
-        info = {k: v for k, v in rows}
+        info = db.get_tape_key_info(tape_id)
 
         if "enc_sym_key" not in info or "sym_key_hash" not in info:
             return None
 
+        pem_mtime = os.path.getmtime(key_path)
+        cached = _sym_key_cache.get(tape_id)
+        if cached and cached[0] == pem_mtime and cached[1] == info["enc_sym_key"]:
+            return cached[2]
+
+        # PEM/ASN.1 parsing of these bytes is cached inside crypto
+        # (_load_private_key), so a cold unlock pays it at most once.
         with open(key_path, "rb") as f:
             priv_pem = f.read()
 
-        enc_key = bytes.fromhex(info["enc_sym_key"])
+        # Raw BLOBs on tapes configured since the hex/BLOB switch,
+        # hex TEXT on older ones.
+        enc_val = info["enc_sym_key"]
+        enc_key = enc_val if isinstance(enc_val, bytes) else bytes.fromhex(enc_val)
         sym_key = decrypt_symmetric_key(enc_key, priv_pem)
 
-        # Verify the decrypted key matches the stored hash
-        if sha256_hex(sym_key) == info["sym_key_hash"]:
+        # Verify the decrypted key matches the stored hash — constant-time,
+        # same as the interactive unlock path.
+        stored = info["sym_key_hash"]
+        if isinstance(stored, bytes):
+            ok = hmac.compare_digest(sha256_bytes(sym_key), stored)
+        else:
+            ok = hmac.compare_digest(sha256_hex(sym_key), stored)
+        if ok:
+            _sym_key_cache[tape_id] = (pem_mtime, info["enc_sym_key"], sym_key)
             return sym_key
     except Exception:
         pass
@@ -58,57 +87,95 @@ def search_files(db, keyword):
     Search across all tapes for files/directories whose names contain keyword
     (case-insensitive).
 
+    Two fully specialised paths: plaintext tapes are filtered by one
+    SQLite statement with no per-row Python at all, and encrypted tapes
+    run a branch-free match over their cached decrypted listings.
+
     Encrypted tapes are automatically unlocked via their local RSA private key.
-    If the key file is absent the filenames on that tape are reported as locked
-    and excluded from matching.
+    If the key file is absent the tape is skipped entirely — nothing on it
+    can match.
 
     Returns a list of dicts with keys:
         tape_id, tape_description, job_id,
         display_name, is_dir, size, locked
     """
     keyword_lower = keyword.lower()
-    tapes = db.conn.execute(
-        "SELECT tape_id, encrypted, description FROM tapes"
-    ).fetchall()
-
+    # LIKE pattern for the plaintext path; % and _ in the keyword are
+    # literal characters to the user, so escape them.
+    like_pattern = "%" + (
+        keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    ) + "%"
     results = []
 
-    for tape_id, is_encrypted, tape_desc in tapes:
-        key = None
-        if is_encrypted:
-            key = auto_unlock_rsa(db, tape_id)
+    # Every plaintext tape in a single statement — nodes is one unified
+    # table, so a join over the tape roster replaces N per-tape queries.
+    # LIKE is case-insensitive for ASCII, matching the .lower()
+    # comparison the Python path applies.
+    plain_rows = db.conn.execute(
+        "SELECT n.tape_id, t.description, n.name, n.is_dir, n.size, n.job_id "
+        "FROM nodes n JOIN tapes t ON t.tape_id = n.tape_id "
+        "WHERE t.encrypted=0 AND n.name LIKE ? ESCAPE '\\'",
+        (like_pattern,)
+    )
+    for tape_id, tape_desc, display_name, is_dir, size, job_id in plain_rows:
+        results.append({
+            "tape_id":          tape_id,
+            "tape_description": tape_desc or "",
+            "job_id":           job_id,
+            "display_name":     display_name,
+            "is_dir":           bool(is_dir),
+            "size":             size or 0,
+            "locked":           False,
+        })
+
+    # Encrypted tapes stay per-tape: each needs its own key, and the
+    # filter must run client-side on the decrypted names.
+    enc_tapes = db.conn.execute(
+        "SELECT tape_id, description FROM tapes WHERE encrypted=1"
+    ).fetchall()
 
-        try:
-            rows = db.conn.execute(
-                f"SELECT name, is_dir, size, job_id FROM tape_{tape_id}"
-            ).fetchall()
-        except Exception:
+    for tape_id, tape_desc in enc_tapes:
+        key = auto_unlock_rsa(db, tape_id)
+        if not key:
+            # No private key: every name on this tape is opaque,
+            # nothing can match — skip the row scan entirely.
             continue
 
-        for name_stored, is_dir, size, job_id in rows:
-            display_name = name_stored
-            locked = False
-
-            if is_encrypted:
-                if key:
-                    try:
-                        display_name = decrypt_name(name_stored, key)
-                    except Exception:
-                        locked = True
-                else:
-                    locked = True
-
-            # Only include rows whose decrypted name matches the keyword
-            if not locked and keyword_lower in display_name.lower():
-                results.append({
-                    "tape_id":          tape_id,
-                    "tape_description": tape_desc or "",
-                    "job_id":           job_id,
-                    "display_name":     display_name,
-                    "is_dir":           bool(is_dir),
-                    "size":             size or 0,
-                    "locked":           False,
-                })
+        version = db.conn.execute(
+            "SELECT COUNT(*), MAX(job_id) FROM nodes WHERE tape_id=?",
+            (tape_id,)
+        ).fetchone()
+        snap = _name_snapshot_cache.get(tape_id)
+        if snap and snap[0] == version:
+            decrypted = snap[1]
+        else:
+            # All names go through one bulk decrypt call per tape.  AES-GCM
+            # dominates this path; the .lower() match on short decrypted
+            # names is noise next to it, so no prefiltering is done here.
+            rows = db.conn.execute(
+                "SELECT name, is_dir, size, job_id FROM nodes WHERE tape_id=?",
+                (tape_id,)
+            ).fetchall()
+            names = decrypt_names_bulk([row[0] for row in rows], key)
+            decrypted = [
+                (display_name, is_dir, size, job_id)
+                for display_name, (_, is_dir, size, job_id) in zip(names, rows)
+                if display_name is not None
+            ]
+            _name_snapshot_cache[tape_id] = (version, decrypted)
+
+        for display_name, is_dir, size, job_id in decrypted:
+            if keyword_lower not in display_name.lower():
+                continue
+            results.append({
+                "tape_id":          tape_id,
+                "tape_description": tape_desc or "",
+                "job_id":           job_id,
+                "display_name":     display_name,
+                "is_dir":           bool(is_dir),
+                "size":             size or 0,
+                "locked":           False,
+            })
 
     return results
 
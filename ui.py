@@ -1,6 +1,7 @@
 import os
 import readchar
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.prompt import Confirm
 from rich.panel import Panel
 from rich.text import Text
@@ -94,30 +95,37 @@ def choose_arrow(title, options, default=0):
     """
     index = default
 
-    while True:
-        console.clear()
-
+    def render(index):
         body = []
         for i, (k, label) in enumerate(options):
             if i == index:
                 body.append(f"[bold black on cyan] ▶ {label} [/]")
             else:
                 body.append(f"   {label}")
-
-        console.print(
+        return Group(
             Panel(
                 "\n".join(body),
                 title=f"[bold]{title}[/]",
                 border_style="cyan"
-            )
+            ),
+            Text("↑ ↓ move   Enter select", style="dim"),
         )
-        console.print("[dim]↑ ↓ move   Enter select[/]")
 
-        key = readchar.readkey()
+    # Live repaints only the menu region, and only when the selection
+    # actually moves — no full-screen clear/re-print per key press, so
+    # no flicker (noticeable over ssh) and O(menu) writes per event.
+    with Live(render(index), console=console, screen=True,
+              auto_refresh=False) as live:
+        while True:
+            key = readchar.readkey()
+
+            if key == readchar.key.UP:
+                index = (index - 1) % len(options)
+            elif key == readchar.key.DOWN:
+                index = (index + 1) % len(options)
+            elif key == readchar.key.ENTER:
+                return options[index][0]
+            else:
+                continue
 
-        if key == readchar.key.UP:
-            index = (index - 1) % len(options)
-        elif key == readchar.key.DOWN:
-            index = (index + 1) % len(options)
-        elif key == readchar.key.ENTER:
-            return options[index][0]
\ No newline at end of file
+            live.update(render(index), refresh=True)
\ No newline at end of file